@@ -9,377 +9,3232 @@ Date: December 2025
 Course: CISC-121
 """
 
+import time
+
+# Taken before the heavy imports below so start-up time can be reported
+STARTUP_STARTED = time.perf_counter()
+
+import base64
+import cProfile
+import functools
+import hashlib
+import io
+import mmap
+import multiprocessing
+import os
+import pstats
+import random
+import shutil
+import struct
+import subprocess
+import tempfile
+import threading
+import warnings
+import zlib
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
 import gradio as gr
-import matplotlib.pyplot as plt
 import numpy as np
-import random
+from gradio.components.plot import PlotData
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+IMPORTS_FINISHED = time.perf_counter()
+
+
+class SearchStep:
+    """
+    One iteration of binary search: the pointers and the value that was checked.
+
+    Uses __slots__ so each step is a small fixed-size record instead of a dict.
+    The number of eliminated elements is derived on demand rather than stored.
+    """
+    __slots__ = ('low', 'high', 'mid', 'value', 'comparison', 'size')
+
+    def __init__(self, low, high, mid, value, comparison, size):
+        self.low = low                # Current lower boundary
+        self.high = high              # Current upper boundary
+        self.mid = mid                # Current midpoint being checked
+        self.value = value            # Value at midpoint
+        self.comparison = comparison  # 1-based comparison number
+        self.size = size              # Length of the searched array
+
+    @property
+    def eliminated(self):
+        """Number of elements already ruled out before this step."""
+        return self.low + (self.size - self.high - 1)
+
+    def __repr__(self):
+        return (f"SearchStep(low={self.low}, high={self.high}, mid={self.mid}, "
+                f"value={self.value}, comparison={self.comparison})")
+
+
+class SearchTrace:
+    """
+    Compact record of every step taken by binary_search.
+    
+    The low, high and mid pointers of all steps are packed into a single typed
+    array('q') buffer (three machine integers per step) and the checked values
+    go into a plain list, so recording a step costs one extend and one append
+    instead of building a six-key dictionary.
+    
+    Indexing (trace[i], trace[-1]) and iteration produce SearchStep records on
+    demand. When created with record=False only the number of comparisons is
+    kept, which is all that is needed when the caller only wants the index.
+    """
+    __slots__ = ('size', 'comparisons', 'pointers', 'values')
+
+    def __init__(self, size, record=True):
+        self.size = size
+        self.comparisons = 0
+        self.pointers = array('q') if record else None  # low, high, mid per step
+        self.values = [] if record else None
+
+    @property
+    def recorded(self):
+        """True if the individual steps were kept, False for count-only traces."""
+        return self.values is not None
+
+    @property
+    def low(self):
+        """Lower boundary of every step, as an array."""
+        return self.pointers[0::3]
+
+    @property
+    def high(self):
+        """Upper boundary of every step, as an array."""
+        return self.pointers[1::3]
+
+    @property
+    def mid(self):
+        """Midpoint checked at every step, as an array."""
+        return self.pointers[2::3]
+
+    def append(self, low, high, mid, value):
+        """Records one step of the search."""
+        self.pointers.extend((low, high, mid))
+        self.values.append(value)
+        self.comparisons += 1
+
+    def __len__(self):
+        return self.comparisons
+
+    def __getitem__(self, i):
+        if not self.recorded:
+            raise IndexError("steps were not recorded for this search")
+        if i < 0:
+            i += len(self.values)
+        low, high, mid = self.pointers[3 * i:3 * i + 3]
+        return SearchStep(low, high, mid, self.values[i], i + 1, self.size)
+
+    def __iter__(self):
+        for i in range(len(self.values) if self.recorded else 0):
+            yield self[i]
+
+
+def binary_search(arr, target, record=True):
+    """
+    Implements the binary search algorithm iteratively.
+    
+    Algorithm steps:
+    1. Initialize low pointer to start (0) and high pointer to end (len-1)
+    2. While low <= high:
+        a. Calculate midpoint: mid = (low + high) // 2
+        b. If arr[mid] == target: return mid (found)
+        c. If arr[mid] < target: search right half (low = mid + 1)
+        d. If arr[mid] > target: search left half (high = mid - 1)
+    3. If not found, return -1
+    
+    Time Complexity: O(log n) - each step eliminates half the remaining elements
+    Space Complexity: O(1) - only uses a constant amount of extra space
+    
+    Args:
+        arr: Sorted list of integers to search through
+        target: Integer value to search for
+        record: If False, skip recording the individual steps and only count
+            comparisons (useful when only the index is needed)
+    
+    Returns:
+        Tuple of (index, steps) where:
+        - index is position of target (-1 if not found)
+        - steps is a SearchTrace tracking each iteration
+    """
+    steps = SearchTrace(len(arr), record)
+    if record:
+        # Bind the buffers' methods once so each step avoids attribute lookups
+        add_pointers = steps.pointers.extend
+        add_value = steps.values.append
+    low = 0
+    high = len(arr) - 1
+    comparisons = 0
+    
+    # Main search loop - continues while search space is valid
+    while low <= high:
+        # Calculate midpoint (avoiding integer overflow)
+        mid = (low + high) // 2
+        value = arr[mid]
+        comparisons += 1
+        
+        # Record current state for visualization
+        if record:
+            add_pointers((low, high, mid))
+            add_value(value)
+        
+        # Check if we found the target
+        if value == target:
+            steps.comparisons = comparisons
+            return mid, steps
+        
+        # Target is in right half - eliminate left half
+        elif value < target:
+            low = mid + 1
+        
+        # Target is in left half - eliminate right half
+        else:
+            high = mid - 1
+    
+    # Target not found in array
+    steps.comparisons = comparisons
+    return -1, steps
+
+
+def interpolation_search(arr, target, record=True):
+    """
+    Searches a sorted array by estimating where the target should be.
+    
+    Instead of the midpoint, each step probes the position the target would
+    have if the values between low and high were evenly spaced:
+    
+        pos = low + (target - arr[low]) * (high - low) // (arr[high] - arr[low])
+    
+    On uniformly distributed values this needs about log2(log2(n)) probes
+    instead of log2(n). On skewed data plain interpolation degrades towards
+    a linear scan, so whenever a probe leaves more than half of the range,
+    the next probe is the midpoint instead: every two probes at least halve
+    the range, which caps a search at about 2 * log2(n) probes. Each
+    interpolation step also reads arr[low] and arr[high], so it reads more
+    elements than it makes comparisons.
+    
+    Args:
+        arr: Sorted list of integers to search through
+        target: Integer value to search for
+        record: If False, only count comparisons (see binary_search)
+    
+    Returns:
+        Tuple of (index, steps) like binary_search; each step's 'mid' is the
+        probed position
+    """
+    steps = SearchTrace(len(arr), record)
+    low = 0
+    high = len(arr) - 1
+    comparisons = 0
+    bisect = False
+    
+    while low <= high:
+        width = high - low + 1
+        if bisect:
+            pos = (low + high) // 2
+        else:
+            # Python ints, so the product below cannot overflow
+            low_value, high_value = int(arr[low]), int(arr[high])
+            if target < low_value or target > high_value:
+                break
+            if high_value == low_value:
+                pos = low
+            else:
+                pos = low + (target - low_value) * (high - low) // (high_value - low_value)
+        value = arr[pos]
+        comparisons += 1
+        if record:
+            steps.append(low, high, pos, value)
+        
+        if value == target:
+            steps.comparisons = comparisons
+            return pos, steps
+        elif value < target:
+            low = pos + 1
+        else:
+            high = pos - 1
+        # Fall back to one bisection step after a probe that removed too little
+        bisect = not bisect and high - low + 1 > width // 2
+    
+    steps.comparisons = comparisons
+    return -1, steps
+
+
+def exponential_search(arr, target, record=True):
+    """
+    Gallops forward from the start of the array, then binary searches.
+    
+    Probes indices 0, 1, 2, 4, 8, ... until it passes a value larger than the
+    target, then runs binary search between the last two probes. A target at
+    index i costs about 2 * log2(i) comparisons, so values near the front
+    are found quickly whatever the array's length.
+    
+    Args:
+        arr: Sorted list of integers to search through
+        target: Integer value to search for
+        record: If False, only count comparisons (see binary_search)
+    
+    Returns:
+        Tuple of (index, steps) like binary_search
+    """
+    steps = SearchTrace(len(arr), record)
+    low = 0
+    high = len(arr) - 1
+    comparisons = 0
+    bound = 0
+    galloping = True
+    
+    while low <= high:
+        if galloping:
+            mid = min(bound, high)
+            bound = bound * 2 or 1
+        else:
+            mid = (low + high) // 2
+        value = arr[mid]
+        comparisons += 1
+        if record:
+            steps.append(low, high, mid, value)
+        
+        if value == target:
+            steps.comparisons = comparisons
+            return mid, steps
+        elif value < target:
+            low = mid + 1
+        else:
+            # Overshot: the target lies between the last two probes
+            high = mid - 1
+            galloping = False
+    
+    steps.comparisons = comparisons
+    return -1, steps
+
+
+def batch_search(arr, targets, return_probes=False, return_trace=False):
+    """
+    Runs binary search for many targets at once using vectorized NumPy operations.
+
+    Every target follows exactly the same low/high/mid sequence as binary_search,
+    but all of them advance together: each loop iteration probes one midpoint per
+    target that is still being searched. The loop runs at most floor(log2(n)) + 1
+    times no matter how many targets there are.
+
+    Args:
+        arr: Sorted sequence of integers (list or NumPy array)
+        targets: Sequence or NumPy array of integer targets
+        return_probes: If True, also return the number of comparisons per target
+        return_trace: If True, also return the low/high/mid pointers of every step
+
+    Returns:
+        indices: int64 array with the position of each target (-1 if not found)
+        probes: (optional) int64 array of comparisons made for each target
+        trace: (optional) dictionary with 'low', 'high' and 'mid' int64 arrays of
+            shape (len(targets), max_steps); unused steps are padded with -1
+    """
+    arr = np.asarray(arr)
+    targets = np.asarray(targets).ravel()
+    n = len(arr)
+    m = len(targets)
+
+    indices = np.full(m, -1, dtype=np.int64)
+    probes = np.zeros(m, dtype=np.int64)
+    max_steps = n.bit_length()  # floor(log2(n)) + 1 comparisons at most
+    if return_trace:
+        trace = {key: np.full((m, max_steps), -1, dtype=np.int64)
+                 for key in ('low', 'high', 'mid')}
+
+    # Targets still being searched, with their current boundaries
+    active = np.arange(m) if n > 0 else np.arange(0)
+    low = np.zeros(active.size, dtype=np.int64)
+    high = np.full(active.size, n - 1, dtype=np.int64)
+    step = 0
+
+    while active.size:
+        mid = (low + high) // 2
+        values = arr[mid]
+        wanted = targets[active]
+        probes[active] += 1
+
+        if return_trace:
+            trace['low'][active, step] = low
+            trace['high'][active, step] = high
+            trace['mid'][active, step] = mid
+
+        # Record every target found at this step
+        found = values == wanted
+        indices[active[found]] = mid[found]
+
+        # Move the pointers exactly like the scalar loop does
+        go_right = values < wanted
+        low = np.where(go_right, mid + 1, low)
+        high = np.where(go_right, high, mid - 1)
+
+        # Drop targets that were found or whose search space is exhausted
+        keep = ~found & (low <= high)
+        active, low, high = active[keep], low[keep], high[keep]
+        step += 1
+
+    result = (indices,)
+    if return_probes:
+        result += (probes,)
+    if return_trace:
+        result += (trace,)
+    return result if len(result) > 1 else indices
+
+
+class ProbeCounter:
+    """
+    Wraps an array and counts the elements and memory pages that are read.
+    
+    Passing a ProbeCounter to binary_search instead of the array itself shows
+    how much of an on-disk (memory-mapped) dataset a query really touches.
+    Only integer indexing is supported, which is all binary_search uses.
+    """
+    __slots__ = ('arr', 'elements', 'pages', 'offset', 'itemsize', 'page_size')
+
+    def __init__(self, arr, page_size=mmap.PAGESIZE):
+        self.arr = arr
+        self.elements = 0
+        self.pages = set()
+        self.offset = getattr(arr, 'offset', 0)  # Header size of a .npy memmap
+        self.itemsize = arr.itemsize
+        self.page_size = page_size
+
+    @property
+    def total_pages(self):
+        """Number of pages spanned by the whole array."""
+        end = self.offset + len(self.arr) * self.itemsize
+        return (end - 1) // self.page_size - self.offset // self.page_size + 1
+
+    def __len__(self):
+        return len(self.arr)
+
+    def __getitem__(self, i):
+        self.elements += 1
+        self.pages.add((self.offset + i * self.itemsize) // self.page_size)
+        return self.arr[i]
+
+
+def decision_tree(n):
+    """
+    Lists binary_search's decision tree for an array of n elements in
+    breadth-first order.
+    
+    Node k (counting from 1) is the midpoint binary_search checks at that
+    point of the search; its children are 2k (the left half) and 2k + 1 (the
+    right half). Positions whose search range is empty hold -1.
+    
+    Returns:
+        int64 array of length 2**n.bit_length() (position 0 is unused)
+    """
+    depth = n.bit_length()
+    nodes = np.full(1 << depth, -1, dtype=np.int64)
+    low = np.zeros(1, dtype=np.int64)
+    high = np.full(1, n - 1, dtype=np.int64)
+    
+    for level in range(depth):
+        mid = (low + high) // 2
+        nodes[1 << level:2 << level] = np.where(low <= high, mid, -1)
+        # Children of every node, left and right interleaved: 2k, 2k + 1
+        low = np.column_stack([low, mid + 1]).ravel()
+        high = np.column_stack([mid - 1, high]).ravel()
+    return nodes
+
+
+class EytzingerLayout:
+    """
+    A sorted array rearranged in breadth-first (Eytzinger) order.
+    
+    The layout stores binary_search's own decision tree (see decision_tree),
+    so a query makes exactly the same comparisons and returns the same index,
+    duplicates included. Instead of low/high bookkeeping the descent is just
+    k = 2k + (value < target), and the top levels of the tree, which every
+    query visits, sit together at the front of the array rather than being
+    spread across it, so they stay in cache for large arrays.
+    
+    The layout is built once per array (it reads every element) and keeps
+    two arrays of up to twice the array length: the keys and their original
+    indices (-1 marks an empty slot).
+    """
+    name = 'Eytzinger'
+
+    def __init__(self, arr):
+        arr = np.asarray(arr)
+        self.n = len(arr)
+        self.depth = self.n.bit_length()
+        nodes = decision_tree(self.n)
+        
+        index_type = np.int32 if self.n < 2 ** 31 else np.int64
+        self.index = np.full(self.storage_size(), -1, dtype=index_type)
+        for level in range(self.depth):
+            k = np.arange(1 << level, 2 << level)
+            self.index[self.slots(k, level)] = nodes[k]
+        self.keys = np.zeros(len(self.index), dtype=np.int64)
+        filled = self.index >= 0
+        self.keys[filled] = arr[self.index[filled]]
+
+    def storage_size(self):
+        """Number of storage positions (position 0 is left unused)."""
+        return 1 << self.depth
+
+    def slots(self, k, level):
+        """Storage positions of tree nodes k, all on the given level (vectorized)."""
+        return k
+
+    def slot(self, k, level):
+        """Storage position of a single tree node."""
+        return k
+
+    def search(self, target, record=True):
+        """
+        Searches the layout; same result and SearchTrace as binary_search.
+        
+        Returns:
+            Tuple of (index, steps) in the original array's positions
+        """
+        steps = SearchTrace(self.n, record)
+        if record:
+            add_pointers = steps.pointers.extend
+            add_value = steps.values.append
+        keys, index, slot = self.keys, self.index, self.slot
+        end = 1 << self.depth
+        low, high = 0, self.n - 1
+        k = 1
+        level = 0
+        comparisons = 0
+        
+        while k < end:
+            position = slot(k, level)
+            mid = int(index[position])
+            if mid < 0:
+                break
+            value = int(keys[position])
+            comparisons += 1
+            if record:
+                add_pointers((low, high, mid))
+                add_value(value)
+            if value == target:
+                steps.comparisons = comparisons
+                return mid, steps
+            # Branch-free descent: left child 2k, right child 2k + 1
+            go_right = value < target
+            k = 2 * k + go_right
+            if go_right:
+                low = mid + 1
+            else:
+                high = mid - 1
+            level += 1
+        
+        steps.comparisons = comparisons
+        return -1, steps
+
+    def batch_search(self, targets, return_probes=False):
+        """
+        Vectorized search for many targets, like batch_search on the plain array.
+        
+        Returns:
+            indices: int64 array with the position of each target (-1 if not found)
+            probes: (optional) int64 array of comparisons made for each target
+        """
+        targets = np.asarray(targets).ravel()
+        m = len(targets)
+        indices = np.full(m, -1, dtype=np.int64)
+        probes = np.zeros(m, dtype=np.int64)
+        
+        active = np.arange(m) if self.n > 0 else np.arange(0)
+        k = np.ones(active.size, dtype=np.int64)
+        level = 0
+        
+        while active.size:
+            position = self.slots(k, level)
+            mid = self.index[position]
+            values = self.keys[position]
+            wanted = targets[active]
+            probes[active] += 1
+            
+            found = values == wanted
+            indices[active[found]] = mid[found]
+            k = 2 * k + (values < wanted)
+            level += 1
+            
+            # Drop found targets and those that fell off the tree or into a hole
+            keep = ~found
+            if level < self.depth:
+                keep &= self.index[self.slots(k, level)] >= 0
+            else:
+                keep[:] = False
+            active, k = active[keep], k[keep]
+        
+        return (indices, probes) if return_probes else indices
+
+    def path_slots(self, steps):
+        """Storage positions probed by a search, one per step of its trace."""
+        low = steps.low
+        k = 1
+        slots = []
+        for level in range(len(steps)):
+            slots.append(self.slot(k, level))
+            if level + 1 < len(steps):
+                k = 2 * k + (low[level + 1] > low[level])
+        return slots
+
+    def filled_slots(self):
+        """Storage positions that hold an element, in storage order."""
+        return np.flatnonzero(self.index >= 0).tolist()
+
+
+class BlockedLayout(EytzingerLayout):
+    """
+    binary_search's decision tree cut into blocks of block_height levels.
+    
+    Each block stores a complete subtree of 2**block_height - 1 keys (7 keys
+    = 56 bytes with the default height of 3, so one 64-byte cache line) in
+    breadth-first order, and the blocks themselves are stored breadth-first,
+    like the nodes of a B-tree with 2**block_height children. A query reads
+    one block per block_height comparisons instead of touching a new part of
+    the array at every level. The comparisons and results are still exactly
+    those of binary_search.
+    """
+    name = 'Blocked'
+
+    def __init__(self, arr, block_height=3):
+        self.block_height = block_height
+        depth = len(arr).bit_length()
+        levels = -(-depth // block_height)
+        # Keys per block on each block level (the last level may be shorter)
+        self.block_sizes = [(1 << min(block_height, depth - level * block_height)) - 1
+                            for level in range(levels)]
+        # Storage position where each block level starts
+        self.level_offsets = [0]
+        for level, block_size in enumerate(self.block_sizes[:-1]):
+            self.level_offsets.append(self.level_offsets[-1]
+                                      + (1 << level * block_height) * block_size)
+        super().__init__(arr)
+
+    def storage_size(self):
+        """Number of storage positions (every block is full except on the last level)."""
+        return (1 << self.depth) - 1
+
+    def slots(self, k, level):
+        """Storage positions of tree nodes k, all on the given level (vectorized)."""
+        return self.slot(k, level)
+
+    def slot(self, k, level):
+        """
+        Storage position of tree node k on the given level.
+        
+        The node's block starts block_height levels up at its block root; the
+        position is the block level's start, plus the block's rank among the
+        blocks on that level, plus the node's breadth-first rank in the block.
+        Works on NumPy arrays of nodes as well.
+        """
+        block_level, row = divmod(level, self.block_height)
+        root = k >> row
+        return (self.level_offsets[block_level]
+                + (root - (1 << block_level * self.block_height)) * self.block_sizes[block_level]
+                + (1 << row) - 1 + (k - (root << row)))
+
+
+# Colors shared by every rendered frame
+ELIMINATED_COLOR = '#d3d3d3'
+MID_COLOR = '#00bfff'
+FOUND_COLOR = '#00ff88'
+BOUNDARY_COLOR = '#ff8c42'
+ACTIVE_COLOR = '#ffd93d'
+NOT_FOUND_FILL = '#ffcccc'
+NOT_FOUND_COLOR = '#cc0000'
+
+
+# Arrays up to this size are drawn with one bar per element
+MAX_VISUAL_ELEMENTS = 20
+
+# Largest array accepted when large-array mode is turned on
+MAX_LARGE_ELEMENTS = 10_000_000
+
+# Bars drawn for a large array, whatever its size (fits a 600 px tall chart)
+LOD_ROWS = 24
+
+# Summary bars used for each eliminated region of a large array
+EDGE_BINS = 2
+
+
+def split_range(start, end, bins):
+    """
+    Splits the index range [start, end] into at most `bins` contiguous chunks.
+    
+    Returns:
+        List of (first, last) index pairs covering the range in order
+    """
+    count = end - start + 1
+    bins = min(bins, count)
+    if bins <= 0:
+        return []
+    edges = [start + count * k // bins for k in range(bins + 1)]
+    return [(edges[k], edges[k + 1] - 1) for k in range(bins)]
+
+
+def lod_rows(n, low, high, mid, max_rows=LOD_ROWS):
+    """
+    Chooses the bars used to draw one step of a search over a large array.
+    
+    Only the active [low, high] window is shown in detail. Each eliminated
+    region is summarised by a couple of bars, and if the window itself is too
+    big, LOW, MID and HIGH keep their own bars while the elements between them
+    are grouped into evenly sized bins. The number of bars never exceeds
+    max_rows, so drawing cost does not depend on n.
+    
+    Args:
+        n: Length of the array
+        low, high, mid: Pointers of the step being drawn (mid is None and
+            low > high once the search is over)
+        max_rows: Maximum number of bars
+    
+    Returns:
+        List of (first, last) index ranges, one per bar, in index order
+    """
+    if mid is None or low > high:
+        return split_range(0, n - 1, max_rows)
+    
+    left = split_range(0, low - 1, EDGE_BINS)
+    right = split_range(high + 1, n - 1, EDGE_BINS)
+    budget = max_rows - len(left) - len(right)
+    
+    if high - low + 1 <= budget:
+        # The whole window fits: one bar per element
+        window = [(i, i) for i in range(low, high + 1)]
+    else:
+        # Keep LOW, MID and HIGH as single bars and bin what lies between them
+        gap_bins = (budget - 3) // 2
+        window = ([(low, low)] + split_range(low + 1, mid - 1, gap_bins)
+                  + [(mid, mid)] + split_range(mid + 1, high - 1, gap_bins)
+                  + [(high, high)])
+    return left + window + right
+
+
+def frame_rows(n, low, high, mid):
+    """
+    Returns the bars for one frame: one per element for small arrays, or the
+    level-of-detail rows from lod_rows once n exceeds MAX_VISUAL_ELEMENTS.
+    """
+    if n > MAX_VISUAL_ELEMENTS:
+        return lod_rows(n, low, high, mid)
+    return [(i, i) for i in range(n)]
+
+
+def rows_data(arr, rows):
+    """
+    Builds the bar values, index labels and value labels for a list of rows.
+    
+    A single-element row is drawn exactly like before; a binned row is as long
+    as its largest (last) value and labelled with its index and value range.
+    """
+    values, labels, texts = [], [], []
+    for first, last in rows:
+        values.append(arr[last])
+        if first == last:
+            labels.append(f'[{first}]')
+            texts.append(f'{arr[first]}')
+        else:
+            labels.append(f'[{first}-{last}]')
+            texts.append(f'{arr[first]}–{arr[last]}')
+    return values, labels, texts
+
+
+def bars(arr, rows, base=None):
+    """rows_data(arr, rows), taken from base (see PreparedArray.base) when it has the same rows."""
+    if base is not None and base[0] == rows:
+        return base[1]
+    return rows_data(arr, rows)
+
+
+def step_frame(arr, step, is_found=False, step_number=1, total_steps=1, base=None):
+    """
+    Describes what a single search step should look like, without drawing it.
+    
+    A frame is a plain dictionary listing the bar values, bar colors, pointer
+    positions and title. Keeping this separate from the drawing code lets a
+    figure template redraw only what changed between two frames. Arrays longer
+    than MAX_VISUAL_ELEMENTS are drawn at a reduced level of detail (see
+    lod_rows).
+    
+    Args:
+        arr: The array being searched
+        step: SearchStep with current low, high, mid pointers and value
+        is_found: Boolean indicating whether target was found
+        step_number: Current step number
+        total_steps: Total number of steps
+        base: Optional PreparedArray.base; its bars are reused when this
+            frame has the same rows
+    
+    Returns:
+        Frame dictionary understood by FigureTemplate.draw
+    """
+    n = len(arr)
+    low_idx = step.low
+    high_idx = step.high
+    mid_idx = step.mid
+    
+    rows = frame_rows(n, low_idx, high_idx, mid_idx)
+    
+    # Determine colors for each bar (binned bars never hold a pointer, so
+    # looking at their first index is enough)
+    colors = []
+    for i, _ in rows:
+        if i < low_idx or i > high_idx:
+            # Eliminated - gray and faded
+            colors.append(ELIMINATED_COLOR)
+        elif i == mid_idx:
+            # Current midpoint - cyan for checking, green if found
+            colors.append(FOUND_COLOR if is_found else MID_COLOR)
+        elif i == low_idx or i == high_idx:
+            # Boundaries - orange
+            colors.append(BOUNDARY_COLOR)
+        else:
+            # Active search space - yellow
+            colors.append(ACTIVE_COLOR)
+    
+    # Bar positions of the pointers
+    row_of = {first: r for r, (first, last) in enumerate(rows) if first == last}
+    
+    # Title with status
+    if is_found:
+        title_color = '#00aa00'
+        title_text = f'FOUND! Target at index {mid_idx} (value = {step.value})'
+    else:
+        title_color = '#333333'
+        title_text = f'Step {step_number}/{total_steps}: Checking index {mid_idx} (value = {step.value})'
+    
+    values, labels, texts = bars(arr, rows, base)
+    return {
+        'values': values,
+        'labels': labels,
+        'texts': texts,
+        'colors': colors,
+        'edgecolor': 'black',
+        'low': row_of[low_idx] if low_idx <= high_idx else None,
+        'high': row_of[high_idx] if low_idx <= high_idx else None,
+        'mid': row_of[mid_idx],
+        'found': is_found,
+        'title': title_text,
+        'title_color': title_color,
+        'overlay': None,
+    }
+
+
+def not_found_frame(arr, target, steps, base=None):
+    """
+    Describes the final "target not found" picture for a finished search.
+    
+    Args:
+        arr: The array that was searched
+        target: The value that was searched for
+        steps: SearchTrace returned by binary_search
+        base: Optional PreparedArray.base, whose bars are exactly this frame's
+    
+    Returns:
+        Frame dictionary understood by FigureTemplate.draw
+    """
+    rows = frame_rows(len(arr), 0, -1, None)
+    values, labels, texts = bars(arr, rows, base)
+    return {
+        'values': values,
+        'labels': labels,
+        'texts': texts,
+        'colors': [NOT_FOUND_FILL] * len(rows),  # Light red for all elements
+        'edgecolor': NOT_FOUND_COLOR,
+        'low': None,
+        'high': None,
+        'mid': None,
+        'found': False,
+        'title': f'Search Complete: Target {target} not found after {len(steps)} comparisons',
+        'title_color': NOT_FOUND_COLOR,
+        'overlay': 'TARGET NOT FOUND',
+    }
+
+
+def layout_frame(layout, steps, is_found=False, target=None, shown=None):
+    """
+    Describes a search in a layout's storage order rather than array order.
+    
+    The bars are the layout's storage positions: all of them (skipping empty
+    ones) when the array has at most MAX_VISUAL_ELEMENTS elements, otherwise
+    just the positions the search probed. Probed positions are highlighted,
+    which shows the path jumping forward through the layout.
+    
+    Args:
+        layout: EytzingerLayout or BlockedLayout that was searched
+        steps: SearchTrace returned by layout.search
+        is_found: Whether the last step found the target
+        target: The value searched for (used in the not-found title)
+        shown: Number of steps to show (all of them by default), for playback
+    
+    Returns:
+        Frame dictionary understood by FigureTemplate.draw
+    """
+    path = layout.path_slots(steps)
+    total = len(path)
+    shown = total if shown is None else shown
+    visited = path[:shown]
+    current = visited[-1] if visited else None
+    finished = shown == total
+    
+    if layout.n <= MAX_VISUAL_ELEMENTS:
+        slots = layout.filled_slots()
+    else:
+        slots = path
+    
+    colors = []
+    for slot in slots:
+        if slot == current:
+            colors.append(FOUND_COLOR if is_found and finished else MID_COLOR)
+        elif slot in visited:
+            colors.append(ACTIVE_COLOR)
+        else:
+            colors.append(ELIMINATED_COLOR)
+    
+    values = [int(layout.keys[slot]) for slot in slots]
+    labels = [f'[{slot}]' for slot in slots]
+    texts = [f'{value} (index {layout.index[slot]})' for value, slot in zip(values, slots)]
+    
+    overlay = None
+    if finished and not is_found:
+        title_color = NOT_FOUND_COLOR
+        title = f'{layout.name} layout: target {target} not found after {total} comparisons'
+        overlay = 'TARGET NOT FOUND'
+    elif finished:
+        title_color = '#00aa00'
+        title = (f'{layout.name} layout: FOUND! Target at position {current} '
+                 f'(index {layout.index[current]})')
+    else:
+        title_color = '#333333'
+        title = (f'{layout.name} layout, step {shown}/{total}: checking position '
+                 f'{current} (index {layout.index[current]})')
+    
+    return {
+        'values': values,
+        'labels': labels,
+        'texts': texts,
+        'colors': colors,
+        'edgecolor': 'black' if is_found or not finished else NOT_FOUND_COLOR,
+        'low': None,
+        'high': None,
+        'mid': slots.index(current) if current is not None else None,
+        'found': is_found and finished,
+        'title': title,
+        'title_color': title_color,
+        'overlay': overlay,
+    }
+
+
+@functools.cache
+def load_matplotlib():
+    """
+    Imports the parts of matplotlib used for drawing, on first use.
+    
+    Matplotlib is only needed once a figure is drawn, so it is not imported
+    with the module; this keeps it out of start-up (and out of the process
+    entirely in browser render mode). The headless Agg backend is forced so
+    no GUI toolkit is ever probed.
+    
+    Returns:
+        Tuple of (Figure, FigureCanvasAgg, Rectangle)
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Rectangle
+    return Figure, FigureCanvasAgg, Rectangle
+
+
+class FigureTemplate:
+    """
+    A reusable bar chart figure for arrays with a fixed number of rows.
+    
+    Building a figure (axes, bars, labels, annotations, legend, layout) is the
+    most expensive part of a request, so it is done once per array length.
+    Drawing a frame afterwards only updates the existing artists: bar colors,
+    pointer positions and the title, plus bar widths and value labels when the
+    array values differ from the previous frame.
+    
+    A template is not thread-safe: use checkout_template() so that only one
+    request draws on it at a time.
+    """
+
+    def __init__(self, rows):
+        Figure, FigureCanvasAgg, Rectangle = load_matplotlib()
+        self.rows = rows
+        # Plain Figure with its own Agg canvas: no pyplot global state involved
+        self.fig = Figure(figsize=(14, 6))
+        FigureCanvasAgg(self.fig)
+        self.ax = ax = self.fig.add_subplot()
+        self.data = None
+        
+        # Create horizontal bars and value labels (real values are set in draw)
+        y_positions = np.arange(rows)
+        self.bars = ax.barh(y_positions, [1] * rows, color=ACTIVE_COLOR,
+                            edgecolor='black', linewidth=2, height=0.7)
+        self.value_labels = [
+            ax.text(0, bar.get_y() + bar.get_height()/2, '', va='center',
+                    fontsize=12, fontweight='bold')
+            for bar in self.bars
+        ]
+        
+        # Add index labels on the left
+        ax.set_yticks(y_positions)
+        ax.set_yticklabels([f'[{i}]' for i in range(rows)], fontsize=11)
+        
+        # Pointer annotations, moved into place by draw
+        self.low_pointer = self._pointer('LOW', BOUNDARY_COLOR, 11, 0.3, 2, 'right')
+        self.high_pointer = self._pointer('HIGH', BOUNDARY_COLOR, 11, 0.3, 2, 'right')
+        self.mid_pointer = self._pointer('MID', MID_COLOR, 12, 0.5, 3, 'left')
+        
+        # Big "NOT FOUND" overlay, hidden until needed
+        self.overlay = ax.text(0, rows/2, '', ha='center', va='center',
+                               fontsize=32, fontweight='bold',
+                               color=NOT_FOUND_COLOR, alpha=0.7, visible=False,
+                               bbox=dict(boxstyle='round,pad=1', facecolor='white',
+                                         edgecolor=NOT_FOUND_COLOR, linewidth=4, alpha=0.9))
+        
+        # Configure axes
+        ax.set_xlabel('Value', fontsize=13, fontweight='bold')
+        ax.set_ylabel('Index', fontsize=13, fontweight='bold')
+        ax.set_title(' ', fontsize=14, fontweight='bold', pad=20)
+        ax.grid(axis='x', alpha=0.3, linestyle='--')
+        
+        # Add legend
+        legend_elements = [
+            Rectangle((0,0),1,1, fc=MID_COLOR, ec='black', lw=2, label='Current Check (MID)'),
+            Rectangle((0,0),1,1, fc=BOUNDARY_COLOR, ec='black', lw=2, label='Search Boundaries (LOW/HIGH)'),
+            Rectangle((0,0),1,1, fc=ACTIVE_COLOR, ec='black', lw=2, label='Active Search Space'),
+            Rectangle((0,0),1,1, fc=ELIMINATED_COLOR, ec='black', lw=2, label='Eliminated'),
+        ]
+        self.legend = ax.legend(handles=legend_elements, loc='upper right',
+                                fontsize=10, framealpha=0.9)
+        
+        # Margins computed by tight_layout, keyed by what sticks out of the axes
+        pars = self.fig.subplotpars
+        self.default_layout = dict(left=pars.left, right=pars.right,
+                                   bottom=pars.bottom, top=pars.top)
+        self.layouts = {}
+
+    def _pointer(self, label, color, fontsize, pad, lw, ha):
+        """Creates one LOW/HIGH/MID annotation; positions are set in draw."""
+        return self.ax.annotate(
+            label, xy=(0, 0), xytext=(0, 0), ha=ha, va='center',
+            fontsize=fontsize, fontweight='bold', color=color, visible=False,
+            bbox=dict(boxstyle=f'round,pad={pad}', facecolor=color, alpha=0.3),
+            arrowprops=dict(arrowstyle='->', color=color, lw=lw))
+
+    def _set_values(self, values, labels, texts):
+        """Updates bar widths, value and index labels and axis limits for new data."""
+        top = max(values)
+        for bar, label, value, text in zip(self.bars, self.value_labels, values, texts):
+            bar.set_width(value)
+            label.set_x(value + top * 0.02)
+            label.set_text(text)
+        self.ax.set_yticklabels(labels, fontsize=11)
+        self.ax.set_xlim(0, top * 1.3)
+        self.overlay.set_x(top * 0.5)
+
+    def _move_pointer(self, pointer, row, x, text_x):
+        """Shows a pointer at the given row, or hides it when row is None."""
+        if row is None:
+            pointer.set_visible(False)
+            return
+        pointer.xy = (x, row)
+        pointer.set_position((text_x, row))
+        pointer.set_visible(True)
+
+    def _apply_layout(self, frame):
+        """
+        Sets the figure margins for this frame, running tight_layout only once
+        for each distinct arrangement of pointers that reach outside the axes.
+        """
+        mid = frame['mid']
+        values = frame['values']
+        if mid is None:
+            position = None
+        else:
+            # Where the MID pointer sits along the axis; without a positive
+            # largest value there is no scale, so use the value itself
+            top = max(values)
+            position = round(values[mid] / top * 20) if top > 0 else values[mid]
+        key = (
+            frame['low'] is not None,
+            None if mid is None else (frame['found'], position),
+            max(len(label) for label in frame['labels']),
+        )
+        params = self.layouts.get(key)
+        if params is None:
+            # Start from the default margins so the result matches a fresh figure
+            self.fig.subplots_adjust(**self.default_layout)
+            self.fig.tight_layout()
+            pars = self.fig.subplotpars
+            params = self.layouts[key] = dict(left=pars.left, right=pars.right,
+                                              bottom=pars.bottom, top=pars.top)
+        else:
+            self.fig.subplots_adjust(**params)
+
+    def draw(self, frame):
+        """
+        Updates the existing artists to show the given frame.
+        
+        Returns:
+            The template's Matplotlib figure
+        """
+        values = frame['values']
+        data = (values, frame['labels'], frame['texts'])
+        if data != self.data:
+            self._set_values(*data)
+            self.data = data
+        
+        for bar, color in zip(self.bars, frame['colors']):
+            bar.set_facecolor(color)
+            bar.set_edgecolor(frame['edgecolor'])
+        
+        # Move the pointer annotations
+        pointer_offset = max(values) * 0.15
+        self._move_pointer(self.low_pointer, frame['low'], 0, -pointer_offset)
+        self._move_pointer(self.high_pointer, frame['high'], 0, -pointer_offset)
+        
+        mid = frame['mid']
+        if mid is not None:
+            mid_color = FOUND_COLOR if frame['found'] else MID_COLOR
+            self.mid_pointer.set_text('FOUND!' if frame['found'] else 'MID')
+            self.mid_pointer.set_color(mid_color)
+            self.mid_pointer.get_bbox_patch().set_facecolor(mid_color)
+            self.mid_pointer.arrow_patch.set_color(mid_color)
+            self._move_pointer(self.mid_pointer, mid, values[mid],
+                               values[mid] + pointer_offset * 2)
+        else:
+            self._move_pointer(self.mid_pointer, None, 0, 0)
+        
+        # Title, legend and overlay
+        self.ax.title.set_text(frame['title'])
+        self.ax.title.set_color(frame['title_color'])
+        self._apply_layout(frame)
+        
+        overlay = frame['overlay']
+        self.legend.set_visible(overlay is None)
+        self.overlay.set_visible(overlay is not None)
+        if overlay is not None:
+            self.overlay.set_text(overlay)
+        else:
+            found = frame['found']
+            self.legend.legend_handles[0].set_facecolor(FOUND_COLOR if found else MID_COLOR)
+            self.legend.get_texts()[0].set_text('FOUND!' if found else 'Current Check (MID)')
+        
+        return self.fig
+
+
+class ErrorTemplate:
+    """A reusable figure that shows an error message in place of the chart."""
+
+    def __init__(self):
+        Figure, FigureCanvasAgg, _ = load_matplotlib()
+        self.fig = Figure(figsize=(10, 4))
+        FigureCanvasAgg(self.fig)
+        ax = self.fig.add_subplot()
+        self.text = ax.text(0.5, 0.5, '', ha='center', va='center', 
+                            fontsize=14, color='red', transform=ax.transAxes, wrap=True)
+        ax.axis('off')
+        self.fig.tight_layout()
+
+    def draw(self, message):
+        """Shows the given message and returns the figure."""
+        self.text.set_text(message)
+        return self.fig
+
+
+# Maximum number of idle templates kept for each figure shape
+MAX_IDLE_TEMPLATES = int(os.environ.get('MAX_IDLE_TEMPLATES', 4))
+
+# Idle templates waiting to be reused, keyed by shape (number of rows or 'error')
+_template_pool = {}
+_template_pool_lock = threading.Lock()
+
+
+@contextmanager
+def checkout_template(key):
+    """
+    Lends a figure template to the caller for exclusive use.
+    
+    Templates are taken from a pool so concurrent requests never draw on the
+    same figure. A new template is built when none is idle; when it is given
+    back, it is kept only if the pool for that shape has room. Dropped
+    templates are freed like any other object because no pyplot registry
+    holds on to them.
+    
+    Args:
+        key: Number of bar rows, or 'error' for the error message figure
+    
+    Yields:
+        A FigureTemplate (or ErrorTemplate) owned by the caller until exit
+    """
+    with _template_pool_lock:
+        idle = _template_pool.setdefault(key, [])
+        template = idle.pop() if idle else None
+    if template is None:
+        template = ErrorTemplate() if key == 'error' else FigureTemplate(key)
+    
+    try:
+        yield template
+    finally:
+        with _template_pool_lock:
+            idle = _template_pool[key]
+            keep = len(idle) < MAX_IDLE_TEMPLATES
+            if keep:
+                idle.append(template)
+        if not keep:
+            # Drop the artists and render buffer now instead of waiting for
+            # the garbage collector to find the figure's reference cycles
+            template.fig.clear()
+
+
+def figure_to_png(fig):
+    """Renders a figure with the Agg backend and returns the PNG bytes."""
+    with io.BytesIO() as buffer:
+        fig.savefig(buffer, format='png')
+        return buffer.getvalue()
+
+
+def render_png(frame):
+    """
+    Draws a frame (or an error message string) on a pooled template.
+    
+    This is the rendering job itself; it runs in this process or in a worker
+    of the render pool.
+    
+    Returns:
+        Tuple of (png_bytes, figure_seconds, serialize_seconds)
+    """
+    key = 'error' if isinstance(frame, str) else len(frame['values'])
+    with checkout_template(key) as template:
+        start = time.perf_counter()
+        fig = template.draw(frame)
+        drawn = time.perf_counter()
+        png = figure_to_png(fig)
+    return png, drawn - start, time.perf_counter() - drawn
+
+
+# Array lengths whose figure templates are built during warm-up: the example
+# array (10 elements) and every length the "Random Array" button produces
+WARM_UP_ROWS = tuple(range(6, 13))
+
+
+def warm_renderer(rows=WARM_UP_ROWS):
+    """
+    Loads matplotlib and builds templates before any real request arrives.
+    
+    Draws one chart for each length in rows and one error figure, so the
+    font cache is filled and those templates sit ready in the pool. Used as
+    the initializer of render pool workers and for start-up warm-up.
+    """
+    for size in rows:
+        sample = np.arange(size, dtype=np.int64)
+        _, steps = binary_search(sample, size // 2)
+        render_png(step_frame(sample, steps[-1], True, len(steps), len(steps)))
+    render_png("Warming up")
+
+
+class RenderPool:
+    """
+    Warm pool of worker processes that render frames to PNG.
+    
+    Matplotlib holds the GIL while it draws, so in-process rendering keeps
+    concurrent requests on one core. Jobs sent here are frame dictionaries
+    (a few dozen rows, never the full array), and each worker returns the
+    PNG bytes, so rendering throughput grows with the number of workers.
+    
+    On Linux workers are forked, before the server starts, so they share the
+    already imported modules; other platforms use spawn.
+    """
+
+    def __init__(self, workers):
+        method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers,
+                                            mp_context=multiprocessing.get_context(method),
+                                            initializer=warm_renderer)
+        # Start every worker now rather than on the first requests
+        for future in [self.executor.submit(os.getpid) for _ in range(workers)]:
+            future.result()
+
+    def render(self, frame):
+        """Renders a frame in a worker; same result as render_png(frame)."""
+        return self.executor.submit(render_png, frame).result()
+
+    def imap(self, job, items, pending):
+        """
+        Runs job(*item) for every item in the workers, yielding results in order.
+        
+        At most two jobs per worker are in flight, so a long run of frames
+        keeps every worker busy without queueing (or holding the results
+        of) all of them at once. pending is a deque that always holds the
+        items sent but not yet yielded, so a caller can redo them if the
+        pool breaks.
+        """
+        items = iter(items)
+        futures = deque()
+        try:
+            for item in items:
+                pending.append(item)
+                futures.append(self.executor.submit(job, *item))
+                if len(futures) >= 2 * self.workers:
+                    break
+            while futures:
+                result = futures.popleft().result()
+                pending.popleft()
+                for item in items:
+                    pending.append(item)
+                    futures.append(self.executor.submit(job, *item))
+                    break
+                yield result
+        finally:
+            # The caller stopped early: drop the jobs nobody will collect
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self):
+        """Stops the workers, cancelling jobs that have not started."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Number of render worker processes (0 renders in the request thread)
+RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', 0))
+
+# The running RenderPool, if any (see start_render_pool)
+render_pool = None
+
+
+def start_render_pool(workers=RENDER_WORKERS):
+    """Starts the render pool with the given number of workers (0 disables it)."""
+    global render_pool
+    if workers > 0 and render_pool is None:
+        render_pool = RenderPool(workers)
+    return render_pool
+
+
+def stop_render_pool():
+    """Shuts the render pool down; rendering falls back to the request thread."""
+    global render_pool
+    pool, render_pool = render_pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def render_frame(frame):
+    """
+    Renders a frame (or an error message string) to PNG bytes.
+    
+    Uses the render pool when one is running and draws in the calling
+    thread otherwise, or if the pool has broken (e.g. a worker was killed).
+    """
+    pool = render_pool
+    result = None
+    if pool is not None:
+        try:
+            result = pool.render(frame)
+        except BrokenProcessPool:
+            warnings.warn("Render pool is broken; rendering in-process")
+    if result is None:
+        result = render_png(frame)
+    
+    png, figure_seconds, serialize_seconds = result
+    metrics.observe('figure', figure_seconds)
+    metrics.observe('serialize', serialize_seconds)
+    metrics.observe_figure(len(png))
+    return png
+
+
+def render_error(message):
+    """Draws an error message on a pooled figure and returns PNG bytes."""
+    return render_frame(message)
+
+
+def render_jobs(job, items):
+    """
+    Runs a rendering job over many items, in the render pool if one is
+    running, yielding the results in order.
+    
+    job(*item) must return (payload, figure_seconds, serialize_seconds),
+    like render_png. Results are produced as they are consumed, so only a
+    few are ever held at once. If the pool breaks part-way, the remaining
+    items are rendered in this thread.
+    
+    Yields:
+        The payload of each item
+    """
+    def observed(result):
+        payload, figure_seconds, serialize_seconds = result
+        metrics.observe('figure', figure_seconds)
+        metrics.observe('serialize', serialize_seconds)
+        return payload
+    
+    items = iter(items)
+    pending = deque()
+    pool = render_pool
+    if pool is not None:
+        try:
+            for result in pool.imap(job, items, pending):
+                yield observed(result)
+        except BrokenProcessPool:
+            warnings.warn("Render pool is broken; rendering in-process")
+    
+    # Without a pool, or after it broke (redoing the jobs that were in flight)
+    for source in (list(pending), items):
+        for item in source:
+            yield observed(job(*item))
+
+
+def png_plot(**kwargs):
+    """
+    Creates a gr.Plot for charts that are already rendered to PNG (PlotData).
+    
+    The stock postprocess imports matplotlib.figure, even for None, and
+    gr.Plot runs it for its initial value while the UI is built. This app
+    only ever hands the component PlotData, so the instance gets a
+    postprocess that passes PlotData and None straight through, which keeps
+    matplotlib out of start-up. It is set before __init__ runs because
+    __init__ is what postprocesses the initial value. Only this one
+    instance is changed: the class, its frontend and Gradio's component
+    machinery stay as they are.
+    """
+    plot = gr.Plot.__new__(gr.Plot)
+    stock_postprocess = plot.postprocess
+    
+    def postprocess(value):
+        if value is None or isinstance(value, PlotData):
+            return value
+        return stock_postprocess(value)
+    
+    plot.postprocess = postprocess
+    plot.__init__(**kwargs)
+    return plot
+
+
+def plot_payload(png):
+    """Wraps PNG bytes in the format the gr.Plot component displays."""
+    encoded = base64.b64encode(png).decode('ascii')
+    return PlotData(type='matplotlib', plot=f'data:image/png;base64,{encoded}')
+
+
+def has_blank_entry(array_str):
+    """
+    Returns True if a comma-separated string has an empty entry like "1, ,2".
+    
+    Works on the raw bytes with NumPy: after dropping whitespace, an empty
+    entry shows up as two commas in a row (or a comma at either end).
+    """
+    data = np.frombuffer(array_str.encode(), dtype=np.uint8)
+    visible = data[data > ord(' ')]
+    if not visible.size:
+        return False
+    commas = visible == ord(',')
+    return bool(commas[0] or commas[-1] or (commas[1:] & commas[:-1]).any())
+
+
+def parse_array(array_str):
+    """
+    Parses a comma-separated string of integers into an int64 NumPy array.
+    
+    The whole string is parsed in C by NumPy. Inputs the fast parser rejects
+    (empty entries such as "1,,2", or anything that is not a plain integer) are
+    parsed again token by token, so they behave exactly like before: empty
+    entries are skipped and invalid ones raise ValueError.
+    
+    Raises:
+        ValueError: if an entry is not an integer
+        OverflowError: if a value does not fit in 64 bits
+    """
+    info = np.iinfo(np.int64)
+    arr = None
+    # NumPy reads blank entries such as "1, ,2" as 0, so leave those to the slow path
+    array_str = array_str.strip(', \t\r\n')
+    if not has_blank_entry(array_str):
+        with warnings.catch_warnings():
+            # NumPy warns (and will later raise) when it stops before the end
+            warnings.simplefilter('error', DeprecationWarning)
+            try:
+                arr = np.fromstring(array_str, dtype=np.int64, sep=',')
+            except (DeprecationWarning, ValueError):
+                arr = None
+    
+    # NumPy clips out-of-range values, so re-check those the slow way too
+    if arr is None or (arr.size and (arr.max() == info.max or arr.min() == info.min)):
+        tokens = [x.strip() for x in array_str.split(',') if x.strip()]
+        arr = np.array([int(x) for x in tokens], dtype=np.int64)
+    return arr
+
+
+def is_sorted(arr, chunk_size=1 << 20):
+    """
+    Checks that an array is in ascending order in a single O(n) pass.
+    
+    Compares each element with its neighbour chunk by chunk, so the temporary
+    boolean array stays small even for very large (or memory-mapped) inputs.
+    """
+    n = len(arr)
+    for start in range(0, n - 1, chunk_size):
+        block = np.asarray(arr[start:start + chunk_size + 1])
+        if (block[1:] < block[:-1]).any():
+            return False
+    return True
+
+
+# Files already checked to be sorted, keyed by (path, size, modification time)
+_sorted_files = {}
+_sorted_files_lock = threading.Lock()
+MAX_SORTED_FILES = 64
+
+
+def is_sorted_cached(arr):
+    """
+    Like is_sorted, but remembers the answer for memory-mapped files.
+    
+    Checking order reads the whole file once; later searches on the same,
+    unchanged file skip the check and only touch the pages they probe.
+    """
+    if not isinstance(arr, np.memmap) or arr.filename is None:
+        return is_sorted(arr)
+    
+    stat = os.stat(arr.filename)
+    key = (arr.filename, stat.st_size, stat.st_mtime_ns)
+    with _sorted_files_lock:
+        answer = _sorted_files.get(key)
+    if answer is not None:
+        return answer
+    
+    # Checked without the lock, so other requests are not held up while the
+    # file is read; two requests may both check a new file, which is harmless
+    answer = is_sorted(arr)
+    with _sorted_files_lock:
+        if key not in _sorted_files and len(_sorted_files) >= MAX_SORTED_FILES:
+            _sorted_files.pop(next(iter(_sorted_files)))
+        _sorted_files[key] = answer
+    return answer
+
+
+def load_array_file(array_file):
+    """
+    Loads a sorted array from an uploaded .npy or .csv file.
+    
+    .npy files are memory-mapped rather than read: the array stays on disk and
+    only the pages a search actually probes are loaded. CSV files have to be
+    parsed, so they are read into memory.
+    
+    Args:
+        array_file: Path of the file (or an upload handle with a .name path)
+    
+    Returns:
+        Tuple of (arr, error_message)
+        If valid: (integer NumPy array or np.memmap, None)
+        If invalid: (None, error_string)
+    """
+    path = str(getattr(array_file, 'name', array_file))
+    extension = os.path.splitext(path)[1].lower()
+    
+    try:
+        if extension == '.npy':
+            arr = np.load(path, mmap_mode='r', allow_pickle=False)
+        elif extension == '.csv':
+            with open(path) as handle:
+                # Accept one value per line as well as comma-separated rows
+                arr = parse_array(handle.read().replace('\n', ','))
+        else:
+            return None, "Error: Please upload a .npy or .csv file"
+    except (OSError, ValueError):
+        return None, "Error: Could not read the uploaded file as a list of integers"
+    except OverflowError:
+        return None, "Error: Values must fit in a 64-bit integer"
+    
+    if arr.ndim != 1:
+        return None, "Error: The uploaded array must be one-dimensional"
+    if arr.dtype.kind not in 'iu':
+        return None, "Error: The uploaded array must contain integers"
+    # Sorted data ends with its largest value, so only one element is read
+    if arr.dtype.kind == 'u' and arr.size and arr[-1] > np.iinfo(np.int64).max:
+        return None, "Error: Values must fit in a 64-bit integer"
+    if isinstance(arr, np.memmap):
+        return arr, None  # Converting would copy the whole file into memory
+    return arr.astype(np.int64, copy=False), None
+
+
+def validate_array(array_str, large_mode=False, array_file=None):
+    """
+    Parses and checks the array half of the user input.
+    
+    Args:
+        array_str: Comma-separated string of integers
+        large_mode: If True, accept up to MAX_LARGE_ELEMENTS elements instead
+            of MAX_VISUAL_ELEMENTS (large arrays are drawn at reduced detail)
+        array_file: Optional uploaded .npy/.csv file used instead of array_str
+    
+    Returns:
+        Tuple of (arr, error_message)
+        If valid: (int64 NumPy array or np.memmap, None)
+        If invalid: (None, error_string)
+    """
+    if array_file is None and not array_str.strip():
+        return None, "Error: Please enter an array of numbers"
+    
+    try:
+        # Parse array from the uploaded file or the comma-separated string
+        if array_file is not None:
+            arr, error = load_array_file(array_file)
+            if error:
+                return None, error
+        else:
+            arr = parse_array(array_str)
+    except ValueError:
+        return None, "Error: Please enter valid integers only (no letters or symbols)"
+    except OverflowError:
+        return None, "Error: Values must fit in a 64-bit integer"
+    
+    # Validate array is not empty
+    if not len(arr):
+        return None, "Error: Array cannot be empty"
+    
+    # Validate array size (keep visualization readable)
+    if large_mode:
+        if len(arr) > MAX_LARGE_ELEMENTS:
+            return None, f"Error: Large-array mode supports up to {MAX_LARGE_ELEMENTS:,} elements"
+    elif len(arr) > MAX_VISUAL_ELEMENTS:
+        return None, (f"Error: Please limit array to {MAX_VISUAL_ELEMENTS} elements for clear "
+                      "visualization, or turn on large-array mode")
+    
+    # CRITICAL: Check if array is sorted
+    # Binary search ONLY works on sorted arrays
+    if not is_sorted_cached(arr):
+        return None, "Error: Array must be sorted in ascending order for binary search to work"
+    
+    return arr, None
+
+
+def validate_target(target_str):
+    """
+    Parses the target value.
+    
+    Returns:
+        Tuple of (target, error_message); target is None when invalid
+    """
+    if not target_str.strip():
+        return None, "Error: Please enter a target value to search for"
+    try:
+        return int(target_str.strip()), None
+    except ValueError:
+        return None, "Error: Please enter valid integers only (no letters or symbols)"
+
+
+def validate_input(array_str, target_str, large_mode=False, array_file=None):
+    """
+    Validates and parses user input to ensure it meets algorithm requirements.
+    
+    Checks performed:
+    - Input is not empty
+    - All values are valid integers
+    - Array is sorted (required for binary search)
+    - Array size is reasonable for visualization
+    
+    Args:
+        array_str: Comma-separated string of integers
+        target_str: String representation of target integer
+        large_mode: If True, accept up to MAX_LARGE_ELEMENTS elements instead
+            of MAX_VISUAL_ELEMENTS (large arrays are drawn at reduced detail)
+        array_file: Optional uploaded .npy/.csv file used instead of array_str
+    
+    Returns:
+        Tuple of (arr, target, error_message)
+        If valid: (int64 NumPy array or np.memmap, int, None)
+        If invalid: (None, None, error_string)
+    """
+    # Check for empty inputs
+    if array_file is None and not array_str.strip():
+        return None, None, "Error: Please enter an array of numbers"
+    
+    target, error = validate_target(target_str)
+    if error:
+        return None, None, error
+    
+    arr, error = validate_array(array_str, large_mode, array_file)
+    if error:
+        return None, None, error
+    
+    # All validation passed
+    return arr, target, None
+
+
+def input_source(array_str, large_mode=False, array_file=None):
+    """
+    Identifies the array a set of inputs describes, without parsing it.
+    
+    Uploaded files are identified by path, size and modification time; typed
+    arrays by a digest of the text and its length (hashing a string is far
+    cheaper than parsing one, and the session does not keep a copy of it).
+    """
+    if array_file is None:
+        text = (array_str or '').encode('utf-8', 'surrogatepass')
+        digest = hashlib.blake2b(text, digest_size=16).hexdigest()
+        return ('text', digest, len(text), bool(large_mode))
+    path = str(getattr(array_file, 'name', array_file))
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ('file', path, None, None, bool(large_mode))
+    return ('file', path, stat.st_size, stat.st_mtime_ns, bool(large_mode))
+
+
+class PreparedArray:
+    """
+    A validated array kept in a browser session's gr.State between searches.
+    
+    Users usually keep one array and try many targets. Holding the parsed
+    array, its array_key and the bars of its resting picture lets a repeat
+    search skip parsing, the order check and hashing, and go straight to
+    the probe loop and the redraw. Layouts are not kept here: they are
+    looked up by key in get_layout's shared cache, whose MAX_LAYOUTS limit
+    bounds their memory however many sessions there are. Invalid
+    input is remembered too (arr is None and error is set), so clicking
+    again on the same bad input does not parse it again.
+    
+    The UI clears the state whenever the array inputs change; source is
+    checked as well, so a stale object is never used for different input.
+    """
+
+    def __init__(self, source, arr=None, error=None):
+        self.source = source
+        self.arr = arr
+        self.error = error
+        self.key = array_key(arr) if arr is not None else None
+        self._base = None
+
+    @property
+    def base(self):
+        """
+        The (rows, (values, labels, texts)) of the array's resting picture,
+        built on first use. For arrays of at most MAX_VISUAL_ELEMENTS elements
+        every step frame uses these same bars, only recolored.
+        """
+        if self._base is None:
+            rows = frame_rows(len(self.arr), 0, -1, None)
+            self._base = (rows, rows_data(self.arr, rows))
+        return self._base
+
+
+def prepare_array(array_str, large_mode=False, array_file=None, prepared=None):
+    """
+    Returns a PreparedArray for the inputs, reusing prepared if it still
+    describes them and validating the array otherwise.
+    """
+    source = input_source(array_str, large_mode, array_file)
+    if prepared is not None and prepared.source == source:
+        return prepared
+    arr, error = validate_array(array_str, large_mode, array_file)
+    return PreparedArray(source, arr, error)
+
+
+def session_input(array_str, target_str, large_mode=False, array_file=None, prepared=None):
+    """
+    validate_input for the handlers: uses the session's PreparedArray when
+    there is one, so only the target is parsed.
+    
+    Returns:
+        Tuple of (arr, target, error_message, prepared); prepared is None
+        when none was passed in
+    """
+    if prepared is None:
+        return (*validate_input(array_str, target_str, large_mode, array_file), None)
+    if prepared.error:
+        return None, None, prepared.error, prepared
+    target, error = validate_target(target_str)
+    if error:
+        return None, None, error, prepared
+    return prepared.arr, target, None, prepared
+
+
+def generate_random_array():
+    """Generate a random sorted array for demonstration."""
+    size = random.randint(6, 12)
+    start = random.randint(1, 20)
+    step = random.randint(2, 5)
+    arr = [start + i * step for i in range(size)]
+    return ', '.join(map(str, arr))
+
+
+def format_result(arr, target, result, steps, probes=None, layout=None,
+                  engine='binary', engine_probes=None):
+    """
+    Builds the Markdown summary of a search and its efficiency metrics.
+    
+    Args:
+        arr: The array that was searched
+        target: The value that was searched for
+        result: Index returned by binary_search (-1 if not found)
+        steps: SearchTrace returned by binary_search
+        probes: Optional ProbeCounter used for the search, reported as the
+            number of elements and disk pages read
+        layout: Optional EytzingerLayout/BlockedLayout the search ran on,
+            reported with the storage positions it probed
+        engine: Key of the engine that ran the search (see ENGINE_CHOICES)
+        engine_probes: Optional compare_engines() result, shown as a table
+            of comparisons per engine
+    
+    Returns:
+        Markdown string for the results panel
+    """
+    n = len(arr)
+    comparisons = len(steps)
+    lines = ["## Search Complete\n\n"]
+    
+    if result != -1:
+        lines.append("**Status:** Target found\n\n")
+        lines.append(f"**Location:** Index {result} (value = {arr[result]})\n\n")
+        lines.append(f"**Efficiency:** Found in {comparisons} comparison(s)\n\n")
+    else:
+        lines.append("**Status:** Target not found\n\n")
+        lines.append(f"**Comparisons:** {comparisons} check(s) performed\n\n")
+        lines.append(f"**Conclusion:** {target} is not present in this array\n\n")
+    
+    # Add efficiency metrics
+    max_comparisons = int(np.log2(n)) + 1 if n > 0 else 0
+    efficiency = ((n - comparisons) / n * 100) if n > 0 else 0
+    
+    lines.append("### Algorithm Performance\n\n")
+    lines.append(f"- Array size: {n} elements\n")
+    lines.append(f"- Comparisons made: {comparisons}\n")
+    if engine in SEARCH_ENGINES and engine != 'binary':
+        lines.append(f"- Binary search worst case: {max_comparisons}\n")
+    else:
+        lines.append(f"- Maximum possible: {max_comparisons}\n")
+    lines.append(f"- Efficiency gain: {efficiency:.1f}% fewer checks than linear search\n")
+    if probes is not None:
+        lines.append(f"- Elements read from disk: {probes.elements}\n")
+        lines.append(f"- Pages touched: {len(probes.pages)} of {probes.total_pages:,} "
+                     f"({probes.page_size // 1024} KiB pages)\n")
+    lines.append(f"- Search engine: {ENGINE_NAMES[engine]}\n")
+    if layout is not None:
+        path = ' → '.join(str(slot) for slot in layout.path_slots(steps))
+        lines.append(f"- Layout size: {len(layout.index):,} storage positions\n")
+        lines.append(f"- Positions probed: {path}\n")
+    
+    if engine_probes:
+        lines.append("\n| Engine | Comparisons | Elements read | Index |\n")
+        lines.append("|---|---:|---:|---:|\n")
+        for name, key in ENGINE_CHOICES:
+            index, comparisons, reads = engine_probes[key]
+            reads = reads if key in SEARCH_ENGINES else "(own copy)"
+            marker = f"**{name}**" if key == engine else name
+            lines.append(f"| {marker} | {comparisons} | {reads} | {index} |\n")
+    return "".join(lines)
+
+
+# First line of the execution details panel
+STEPS_HEADER = "## Step-by-Step Execution\n\n"
+
+
+def format_steps(steps, target, is_found, probe_name='Midpoint'):
+    """
+    Builds the Markdown step-by-step explanation of a search.
+    
+    Reads the packed pointer buffer of the SearchTrace directly instead of creating
+    a SearchStep record for every iteration.
+    
+    Args:
+        steps: SearchTrace returned by binary_search (must be recorded)
+        target: The value that was searched for
+        is_found: Whether the last step found the target
+        probe_name: What the engine calls the position it checks
+    
+    Returns:
+        Markdown string for the execution details panel
+    """
+    lines = [STEPS_HEADER]
+    for i in range(len(steps.values)):
+        lines.append(format_step(steps, i, target, is_found, probe_name))
+    return "".join(lines)
+
+
+def format_step(steps, i, target, is_found, probe_name='Midpoint'):
+    """
+    Builds the Markdown explanation of step i of a search (see format_steps).
+    
+    Playback appends these one at a time rather than formatting every step
+    shown so far again for each frame.
+    """
+    pointers, values = steps.pointers, steps.values
+    total = len(values)
+    part = 'half' if probe_name == 'Midpoint' else 'side'
+    lines = []
+    low, high, mid = pointers[3 * i:3 * i + 3]
+    value = values[i]
+    lines.append(f"### Step {i + 1}\n\n")
+    lines.append(f"**Search Range:** indices {low} to {high} ")
+    lines.append(f"({high - low + 1} elements)\n\n")
+    lines.append(f"**{probe_name}:** index {mid}\n\n")
+    lines.append(f"**Value checked:** {value}\n\n")
+    
+    # Explain what happens next
+    if i == total - 1 and is_found:
+        lines.append(f"**Result:** {value} = {target} → **Target found!**\n\n")
+    elif i < total - 1:
+        next_range = f"indices {pointers[3 * i + 3]} to {pointers[3 * i + 4]}"
+        if value < target:
+            lines.append(f"**Decision:** {value} < {target}\n\n")
+            lines.append(f"→ Search RIGHT {part} ({next_range})\n\n")
+        else:
+            lines.append(f"**Decision:** {value} > {target}\n\n")
+            lines.append(f"→ Search LEFT {part} ({next_range})\n\n")
+    elif not is_found:
+        lines.append("**Decision:** Search space exhausted → **Target not found**\n\n")
+    
+    lines.append("---\n\n")
+    return "".join(lines)
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of finished search results.
+    
+    Each entry holds the rendered figure (PNG bytes) and the two Markdown
+    panels for one (array, target) pair. The least recently used entries are
+    evicted once either the entry limit or the byte limit is exceeded. Hit
+    and miss counters show how well the cache is working.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def entry_size(value):
+        """Approximate memory used by a cached (png, result_text, steps_text) entry."""
+        png, result_text, steps_text = value
+        return len(png) + len(result_text) + len(steps_text)
+
+    def get(self, key):
+        """Returns the cached value for key (marking it recently used), or None."""
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Stores a value, evicting least recently used entries to stay in bounds."""
+        size = self.entry_size(value)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= self.entry_size(old)
+            self.entries[key] = value
+            self.size += size
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= self.entry_size(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        """Removes every entry and resets the counters."""
+        with self.lock:
+            self.entries.clear()
+            self.size = self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Returns the cache counters as a dictionary."""
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+def array_key(arr):
+    """
+    Returns a hashable key identifying the contents of an array.
+    
+    In-memory arrays are hashed with BLAKE2b. Memory-mapped files are
+    identified by path, size and modification time instead, so building the
+    key never reads the whole file.
+    """
+    if isinstance(arr, np.memmap) and arr.filename is not None:
+        stat = os.stat(arr.filename)
+        return ('file', arr.filename, stat.st_size, stat.st_mtime_ns, arr.dtype.str)
+    data = np.ascontiguousarray(arr)
+    digest = hashlib.blake2b(data.data, digest_size=16).hexdigest()
+    return ('array', digest, len(data), data.dtype.str)
+
+
+# Search engines selectable in the UI. All of them return (index, SearchTrace):
+# the functions search the array directly, the layouts a rearranged copy of it
+SEARCH_ENGINES = {
+    'binary': binary_search,
+    'interpolation': interpolation_search,
+    'exponential': exponential_search,
+}
+SEARCH_LAYOUTS = {
+    'eytzinger': EytzingerLayout,
+    'blocked': BlockedLayout,
+}
+ENGINE_CHOICES = [
+    ("Binary search", 'binary'),
+    ("Interpolation search", 'interpolation'),
+    ("Exponential search", 'exponential'),
+    ("Eytzinger layout", 'eytzinger'),
+    ("Blocked layout", 'blocked'),
+]
+ENGINE_NAMES = {engine: name for name, engine in ENGINE_CHOICES}
+
+# What each engine calls the position it checks, for the step-by-step panel
+PROBE_NAMES = {
+    'interpolation': 'Interpolated position',
+    'exponential': 'Probe',
+}
+
+# Built layouts kept for reuse (each one can be twice the size of its array)
+MAX_LAYOUTS = int(os.environ.get('MAX_LAYOUTS', 4))
+_layouts = OrderedDict()
+_layouts_lock = threading.Lock()
+
+
+def get_layout(arr, engine, key=None):
+    """
+    Returns the layout of the given engine for arr, building it on first use.
+    
+    Layouts are cached by array_key (pass key if it is already known), so
+    searching the same array again skips the build.
+    """
+    cache_key = (engine, array_key(arr) if key is None else key)
+    with _layouts_lock:
+        layout = _layouts.get(cache_key)
+        if layout is not None:
+            _layouts.move_to_end(cache_key)
+            return layout
+    layout = SEARCH_LAYOUTS[engine](arr)
+    with _layouts_lock:
+        _layouts[cache_key] = layout
+        while len(_layouts) > MAX_LAYOUTS:
+            _layouts.popitem(last=False)
+    return layout
+
+
+def run_engine(arr, target, engine='binary', key=None, record=True):
+    """
+    Runs one search with the named engine.
+    
+    Engines that read the array itself get a ProbeCounter when the array is
+    memory-mapped, so the data they read from disk can be reported. Layouts
+    are found (or built) with get_layout; key is the array_key if known.
+    
+    Returns:
+        Tuple of (index, steps, probes, layout); probes and layout are None
+        when they do not apply
+    """
+    if engine in SEARCH_LAYOUTS:
+        with metrics.phase('layout'):
+            layout = get_layout(arr, engine, key)
+        with metrics.phase('search'):
+            result, steps = layout.search(target, record)
+        return result, steps, None, layout
+    
+    probes = ProbeCounter(arr) if isinstance(arr, np.memmap) else None
+    with metrics.phase('search'):
+        result, steps = SEARCH_ENGINES[engine](arr if probes is None else probes, target, record)
+    return result, steps, probes, None
+
+
+def compare_engines(arr, target):
+    """
+    Counts the comparisons and element reads every engine needs for target.
+    
+    The layouts are not built for this: they store binary_search's decision
+    tree, so they make exactly its comparisons (and read their own copy, not
+    the array).
+    
+    Returns:
+        Dictionary of engine -> (index, comparisons, elements_read), in
+        ENGINE_CHOICES order
+    """
+    counts = {}
+    for engine, search_fn in SEARCH_ENGINES.items():
+        reads = ProbeCounter(arr)
+        index, steps = search_fn(reads, target, record=False)
+        counts[engine] = (index, len(steps), reads.elements)
+    for engine in SEARCH_LAYOUTS:
+        index, comparisons, _ = counts['binary']
+        counts[engine] = (index, comparisons, 0)
+    return {engine: counts[engine] for _, engine in ENGINE_CHOICES}
+
+
+# Cache of rendered results shared by all users
+result_cache = ResultCache(
+    max_entries=int(os.environ.get('SEARCH_CACHE_ENTRIES', 256)),
+    max_bytes=int(os.environ.get('SEARCH_CACHE_BYTES', 64 * 1024 * 1024)),
+)
+
+
+class Histogram:
+    """
+    Cumulative histogram in the Prometheus format.
+    
+    Not thread-safe on its own; SearchMetrics guards every update with its lock.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Adds one observation."""
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def lines(self, name, labels=''):
+        """Returns the exposition lines (_bucket, _sum and _count) for this histogram."""
+        sep = ',' if labels else ''
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{bound:g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        suffix = f'{{{labels}}}' if labels else ''
+        lines.append(f'{name}_sum{suffix} {self.sum:.6f}')
+        lines.append(f'{name}_count{suffix} {self.count}')
+        return lines
+
+
+# Histogram bounds for phase durations (seconds), probe counts and PNG sizes (bytes)
+PHASE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PROBE_BUCKETS = (1, 2, 4, 8, 12, 16, 20, 24, 32, 48, 64)
+FIGURE_BUCKETS = (16_384, 32_768, 65_536, 131_072, 262_144, 524_288, 1_048_576)
+
+
+class SearchMetrics:
+    """
+    Per-phase timers and counters for search requests.
+    
+    Phases recorded by search():
+    - validation: parsing and checking the inputs (validate_input)
+    - layout: finding or building the search layout (layout engines only)
+    - search: running the selected search engine
+    - compare: counting the probes of every engine for the results panel
+    - frame: building the frame data for the chart
+    - figure: updating the template artists (including tight_layout the
+      first time a template sees a layout)
+    - serialize: rendering the figure to PNG
+    - format: building the Markdown result and steps
+    - total: the whole search() call
+    
+    figure and serialize are recorded by render_frame/render_error, so they
+    also include frames streamed by "Play Step-by-Step".
+    
+    Every profile_every-th instrumented call also runs under cProfile, and
+    the merged statistics are available from profile_report().
+    """
+
+    def __init__(self, profile_every=0):
+        self.lock = threading.Lock()
+        self.phases = {}
+        self.outcomes = {}
+        self.probes = Histogram(PROBE_BUCKETS)
+        self.figure_bytes = Histogram(FIGURE_BUCKETS)
+        self.disk_elements = 0
+        self.disk_pages = 0
+        self.profile_every = profile_every
+        self.calls = 0
+        self.profile = None
+        self.profiled = 0
+        self.startup = {}
+
+    def observe(self, phase, seconds):
+        """Records how long one phase took."""
+        with self.lock:
+            histogram = self.phases.get(phase)
+            if histogram is None:
+                histogram = self.phases[phase] = Histogram(PHASE_BUCKETS)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def phase(self, name):
+        """Times the enclosed block as one phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def count(self, outcome):
+        """Counts a finished request by outcome (found, not_found, error, cached)."""
+        with self.lock:
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def observe_search(self, steps, probes=None):
+        """Records the comparisons of one search and, for files, the data it read."""
+        with self.lock:
+            self.probes.observe(len(steps))
+            if probes is not None:
+                self.disk_elements += probes.elements
+                self.disk_pages += len(probes.pages)
+
+    def observe_figure(self, size):
+        """Records the size of one rendered PNG."""
+        with self.lock:
+            self.figure_bytes.observe(size)
+
+    def instrumented(self, fn):
+        """
+        Decorator that records the 'total' phase of each call and profiles
+        every profile_every-th call with cProfile. The first call is also
+        kept as the 'first_request' start-up stage.
+        """
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with self.lock:
+                self.calls += 1
+                first = self.calls == 1
+                sample = self.profile_every > 0 and self.calls % self.profile_every == 0
+            start = time.perf_counter()
+            try:
+                if not sample:
+                    return fn(*args, **kwargs)
+                profiler = cProfile.Profile()
+                try:
+                    return profiler.runcall(fn, *args, **kwargs)
+                finally:
+                    self.add_profile(profiler)
+            finally:
+                elapsed = time.perf_counter() - start
+                self.observe('total', elapsed)
+                if first:
+                    self.set_startup('first_request', elapsed)
+        return wrapper
+
+    def set_startup(self, stage, seconds):
+        """Records how long one start-up stage took (imports, ui, warm_up, first_request)."""
+        with self.lock:
+            self.startup[stage] = seconds
+
+    def add_profile(self, profiler):
+        """Merges one sampled call's profile into the running statistics."""
+        profiler.create_stats()
+        with self.lock:
+            if self.profile is None:
+                self.profile = pstats.Stats(profiler)
+            else:
+                self.profile.add(profiler)
+            self.profiled += 1
+
+    def profile_report(self, limit=40):
+        """Returns the merged cProfile statistics as text, sorted by cumulative time."""
+        with self.lock:
+            if self.profile is None:
+                return ("No profiles recorded. Set PROFILE_EVERY=N to profile "
+                        "one in every N search requests.\n")
+            out = io.StringIO()
+            self.profile.stream = out
+            out.write(f"{self.profiled} sampled requests (1 in {self.profile_every})\n")
+            self.profile.sort_stats('cumulative').print_stats(limit)
+            return out.getvalue()
+
+    def render(self):
+        """Returns all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            lines.append('# HELP search_phase_seconds Time spent in each phase of a search request')
+            lines.append('# TYPE search_phase_seconds histogram')
+            for name, histogram in sorted(self.phases.items()):
+                lines.extend(histogram.lines('search_phase_seconds', f'phase="{name}"'))
+            
+            lines.append('# HELP search_requests_total Search requests by outcome')
+            lines.append('# TYPE search_requests_total counter')
+            for outcome, count in sorted(self.outcomes.items()):
+                lines.append(f'search_requests_total{{outcome="{outcome}"}} {count}')
+            
+            lines.append('# HELP search_probes Comparisons made per search')
+            lines.append('# TYPE search_probes histogram')
+            lines.extend(self.probes.lines('search_probes'))
+            
+            lines.append('# HELP search_figure_bytes Size of each rendered PNG')
+            lines.append('# TYPE search_figure_bytes histogram')
+            lines.extend(self.figure_bytes.lines('search_figure_bytes'))
+            
+            lines.append('# HELP search_startup_seconds Duration of each start-up stage')
+            lines.append('# TYPE search_startup_seconds gauge')
+            for stage, seconds in self.startup.items():
+                lines.append(f'search_startup_seconds{{stage="{stage}"}} {seconds:.6f}')
+            
+            lines.append('# HELP search_disk_elements_total Elements read from memory-mapped files')
+            lines.append('# TYPE search_disk_elements_total counter')
+            lines.append(f'search_disk_elements_total {self.disk_elements}')
+            lines.append('# HELP search_disk_pages_total Distinct pages touched in memory-mapped files')
+            lines.append('# TYPE search_disk_pages_total counter')
+            lines.append(f'search_disk_pages_total {self.disk_pages}')
+        
+        cache = result_cache.stats()
+        lines.append('# HELP search_cache_entries Entries in the result cache')
+        lines.append('# TYPE search_cache_entries gauge')
+        lines.append(f'search_cache_entries {cache["entries"]}')
+        lines.append('# HELP search_cache_bytes Bytes held by the result cache')
+        lines.append('# TYPE search_cache_bytes gauge')
+        lines.append(f'search_cache_bytes {cache["bytes"]}')
+        for name in ('hits', 'misses', 'evictions'):
+            lines.append(f'# HELP search_cache_{name}_total Result cache {name}')
+            lines.append(f'# TYPE search_cache_{name}_total counter')
+            lines.append(f'search_cache_{name}_total {cache[name]}')
+        return '\n'.join(lines) + '\n'
+
+
+# Request metrics shared by all users; PROFILE_EVERY=N profiles 1 in N searches
+metrics = SearchMetrics(profile_every=int(os.environ.get('PROFILE_EVERY', 0)))
+metrics.set_startup('imports', IMPORTS_FINISHED - STARTUP_STARTED)
+
+
+async def metrics_endpoint(request):
+    """GET /metrics: request metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(),
+                             media_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+async def profile_endpoint(request):
+    """GET /metrics/profile: merged cProfile statistics of sampled requests."""
+    return PlainTextResponse(metrics.profile_report())
+
+
+class ArrayStore:
+    """
+    Bounded LRU of validated arrays for the batch API, keyed by handle.
+    
+    A handle is the BLAKE2b digest of the array's contents (see array_key),
+    so uploading the same array twice gives the same handle and stores it
+    once. Arrays are evicted least recently used first once the entry or
+    byte limit is exceeded; clients then get a 404 and upload again.
+    """
+
+    def __init__(self, max_entries=32, max_bytes=512 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, handle):
+        """
+        Returns (array, key) for a handle, marking it recently used, or None.
+        
+        key is the array's array_key, kept so that layouts and cached
+        results can be looked up without hashing the array again.
+        """
+        with self.lock:
+            entry = self.entries.get(handle)
+            if entry is not None:
+                self.entries.move_to_end(handle)
+            return entry
+
+    def put(self, arr):
+        """Stores a validated array and returns (handle, key)."""
+        key = array_key(arr)
+        handle = key[1]
+        with self.lock:
+            if handle not in self.entries:
+                self.entries[handle] = (arr, key)
+                self.size += arr.nbytes
+                while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                    _, (evicted, _) = self.entries.popitem(last=False)
+                    self.size -= evicted.nbytes
+            self.entries.move_to_end(handle)
+        return handle, key
+
+    def delete(self, handle):
+        """Removes an array; returns False if the handle was not stored."""
+        with self.lock:
+            entry = self.entries.pop(handle, None)
+            if entry is None:
+                return False
+            self.size -= entry[0].nbytes
+            return True
+
+
+# Arrays uploaded through the batch API, shared by all clients
+array_store = ArrayStore(
+    max_entries=int(os.environ.get('API_ARRAY_ENTRIES', 32)),
+    max_bytes=int(os.environ.get('API_ARRAY_BYTES', 512 * 1024 * 1024)),
+)
+
+# Most targets one API request may search: for the vectorized engines
+# (binary and the layouts) and for the engines that search one at a time
+API_MAX_TARGETS = int(os.environ.get('API_MAX_TARGETS', 1_000_000))
+API_MAX_SCALAR_TARGETS = int(os.environ.get('API_MAX_SCALAR_TARGETS', 10_000))
+
+
+class ApiError(Exception):
+    """A batch API request that cannot be served; carries the HTTP status."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def int64_list(values, field):
+    """
+    Converts a JSON list of integers into an int64 array.
+    
+    Raises:
+        ApiError: if the list is nested, holds non-integers or values
+            that do not fit in 64 bits
+    """
+    try:
+        arr = np.asarray(values)
+    except (ValueError, OverflowError):
+        # Ragged nesting such as [[1], [2, 3]]
+        arr = np.asarray(values, dtype=object)
+    if arr.size == 0:
+        return arr.astype(np.int64).reshape(-1)
+    if arr.ndim != 1 or arr.dtype.kind not in 'iu':
+        raise ApiError(f'"{field}" must be a flat list of integers that fit in 64 bits')
+    if arr.dtype.kind == 'u' and arr.max() > np.iinfo(np.int64).max:
+        raise ApiError(f'"{field}" must contain integers that fit in 64 bits')
+    return arr.astype(np.int64)
+
+
+def api_array(value):
+    """
+    Converts the "array" field of an API request into a validated int64 array.
+    
+    Accepts a JSON list of integers or the same comma-separated string the
+    textbox takes. The array must be sorted and hold at most
+    MAX_LARGE_ELEMENTS elements.
+    """
+    try:
+        if isinstance(value, str):
+            arr = parse_array(value)
+        elif isinstance(value, list):
+            arr = int64_list(value, 'array')
+        else:
+            raise ApiError('"array" must be a list of integers or a comma-separated string')
+    except (ValueError, OverflowError):
+        raise ApiError('"array" must contain integers that fit in 64 bits') from None
+    
+    if not len(arr):
+        raise ApiError('"array" cannot be empty')
+    if len(arr) > MAX_LARGE_ELEMENTS:
+        raise ApiError(f'"array" can hold at most {MAX_LARGE_ELEMENTS:,} elements')
+    if not is_sorted(arr):
+        raise ApiError('"array" must be sorted in ascending order')
+    return arr
+
+
+def api_targets(value):
+    """Converts the "targets" field of an API request into an int64 array."""
+    if not isinstance(value, list):
+        raise ApiError('"targets" must be a list of integers')
+    return int64_list(value, 'targets')
+
+
+def api_search(body):
+    """
+    Serves one batch query: looks up or validates the array, then searches
+    every target without drawing anything.
+    
+    Request fields:
+        array: List of integers (or comma-separated string); stored and
+            returned as a handle for later calls
+        handle: Handle of an array uploaded earlier (instead of array)
+        targets: List of integers to search for (at most API_MAX_TARGETS, or
+            API_MAX_SCALAR_TARGETS for interpolation and exponential search)
+        probes: If true, also return the comparisons made for each target
+        engine: Search engine key (default 'binary'); see ENGINE_CHOICES
+    
+    Returns:
+        JSON-ready dictionary with 'handle', 'size', 'indices' and,
+        if requested, 'probes'
+    """
+    if not isinstance(body, dict):
+        raise ApiError('Request body must be a JSON object')
+    engine = body.get('engine', 'binary')
+    if not isinstance(engine, str) or engine not in ENGINE_NAMES:
+        raise ApiError(f'Unknown engine {engine!r}; use one of {", ".join(ENGINE_NAMES)}')
+    
+    if body.get('handle') is not None:
+        handle = body['handle']
+        entry = array_store.get(handle) if isinstance(handle, str) else None
+        if entry is None:
+            raise ApiError(f'Unknown or expired handle {handle!r}; send the array again', 404)
+        arr, key = entry
+    elif 'array' in body:
+        arr = api_array(body['array'])
+        handle, key = array_store.put(arr)
+    else:
+        raise ApiError('Send either "array" or "handle"')
+    targets = api_targets(body.get('targets', []))
+    # Engines without a batch version loop over the targets in Python
+    if engine == 'binary' or engine in SEARCH_LAYOUTS:
+        limit = API_MAX_TARGETS
+    else:
+        limit = API_MAX_SCALAR_TARGETS
+    if len(targets) > limit:
+        raise ApiError(f'The {engine} engine accepts at most {limit:,} targets per request')
+    
+    want_probes = bool(body.get('probes', False))
+    if engine == 'binary':
+        indices, probes = batch_search(arr, targets, return_probes=True)
+    elif engine in SEARCH_LAYOUTS:
+        indices, probes = get_layout(arr, engine, key).batch_search(
+            targets, return_probes=True)
+    else:
+        search_fn = SEARCH_ENGINES[engine]
+        results = [search_fn(arr, target, record=False) for target in targets.tolist()]
+        indices = [index for index, _ in results]
+        probes = [len(steps) for _, steps in results]
+    
+    response = {
+        'handle': handle,
+        'size': len(arr),
+        'engine': engine,
+        'indices': np.asarray(indices, dtype=np.int64).tolist(),
+    }
+    if want_probes:
+        response['probes'] = np.asarray(probes, dtype=np.int64).tolist()
+    return response
+
+
+async def api_search_endpoint(request):
+    """
+    POST /api/search: searches many targets in one array, no figures.
+    
+    See api_search for the request and response fields. Errors come back as
+    {"error": message} with status 400 (bad request) or 404 (unknown handle).
+    """
+    try:
+        body = await request.json()
+    except ValueError:
+        return JSONResponse({'error': 'Request body must be valid JSON'}, status_code=400)
+    try:
+        with metrics.phase('api_search'):
+            return JSONResponse(await run_in_threadpool(api_search, body))
+    except ApiError as error:
+        return JSONResponse({'error': str(error)}, status_code=error.status)
+
+
+async def api_delete_array_endpoint(request):
+    """DELETE /api/arrays/{handle}: forgets an uploaded array."""
+    if not array_store.delete(request.path_params['handle']):
+        return JSONResponse({'error': 'Unknown handle'}, status_code=404)
+    return JSONResponse({'deleted': request.path_params['handle']})
+
+
+# Extra HTTP routes served next to the Gradio app
+SERVER_ROUTES = [
+    Route('/metrics', metrics_endpoint),
+    Route('/metrics/profile', profile_endpoint),
+    Route('/api/search', api_search_endpoint, methods=['POST']),
+    Route('/api/arrays/{handle}', api_delete_array_endpoint, methods=['DELETE']),
+]
+
+
+@metrics.instrumented
+def search(array_str, target_str, large_mode=False, array_file=None, engine='binary',
+           prepared=None):
+    """
+    Main search function that coordinates the entire process.
+    
+    This function:
+    1. Validates user input
+    2. Executes the binary search algorithm
+    3. Generates the visualization
+    4. Formats the output for display
+    
+    Args:
+        array_str: Comma-separated string of integers from user
+        target_str: Target value string from user
+        large_mode: Whether to accept arrays beyond MAX_VISUAL_ELEMENTS
+        array_file: Optional .npy/.csv file (path or upload handle) used
+            instead of array_str; .npy datasets are searched in place on disk
+        engine: Key of SEARCH_ENGINES, or of SEARCH_LAYOUTS to search (and
+            draw) that layout of the array
+        prepared: Optional PreparedArray for these inputs (see prepare_array);
+            its array, key and bars are used instead of validating
+            and hashing the array again
+    
+    Returns:
+        Tuple of (figure, result_text, steps_text)
+        - figure: Rendered visualization (PNG) for the gr.Plot component
+        - result_text: Summary of search results
+        - steps_text: Detailed step-by-step breakdown
+    """
+    # Step 1: Validate and parse input
+    with metrics.phase('validation'):
+        arr, target, error, prepared = session_input(array_str, target_str, large_mode,
+                                                     array_file, prepared)
+    
+    if error:
+        # Create error visualization
+        metrics.count('error')
+        return plot_payload(render_error(error)), error, ""
+    
+    # Reuse the finished result if this exact search has been done before
+    data_key = array_key(arr) if prepared is None else prepared.key
+    key = (data_key, target, engine)
+    cached = result_cache.get(key)
+    if cached is not None:
+        metrics.count('cached')
+        png, result_msg, steps_text = cached
+        return plot_payload(png), result_msg, steps_text
+    
+    # Step 2: Execute the search with the chosen engine (counting page reads
+    # on memory-mapped data)
+    result, steps, probes, layout = run_engine(arr, target, engine, data_key)
+    metrics.observe_search(steps, probes)
+    with metrics.phase('compare'):
+        engine_probes = compare_engines(arr, target)
+    
+    # Step 3: Generate visualization of the final step
+    is_found = (result != -1)
+    metrics.count('found' if is_found else 'not_found')
+    
+    # For "not found" cases, show the final state with a clear "NOT FOUND" message
+    with metrics.phase('frame'):
+        base = prepared and prepared.base
+        if layout is not None:
+            frame = layout_frame(layout, steps, is_found, target)
+        elif not is_found:
+            frame = not_found_frame(arr, target, steps, base)
+        else:
+            frame = step_frame(arr, steps[-1], is_found, len(steps), len(steps), base)
+    png = render_frame(frame)
+    
+    # Step 4 and 5: Format result message and detailed step-by-step execution
+    with metrics.phase('format'):
+        result_msg = format_result(arr, target, result, steps, probes, layout,
+                                   engine, engine_probes)
+        steps_text = format_steps(steps, target, is_found,
+                                  probe_name=PROBE_NAMES.get(engine, 'Midpoint'))
+    
+    result_cache.put(key, (png, result_msg, steps_text))
+    return plot_payload(png), result_msg, steps_text
 
 
-def binary_search(arr, target):
+def trace_payload(arr, target, result, steps):
     """
-    Implements the binary search algorithm iteratively.
+    Packs a finished search into a small JSON-ready dictionary for the browser.
     
-    Algorithm steps:
-    1. Initialize low pointer to start (0) and high pointer to end (len-1)
-    2. While low <= high:
-        a. Calculate midpoint: mid = (low + high) // 2
-        b. If arr[mid] == target: return mid (found)
-        c. If arr[mid] < target: search right half (low = mid + 1)
-        d. If arr[mid] > target: search left half (high = mid - 1)
-    3. If not found, return -1
+    Only the bars of the final frame (the whole array when it has at most
+    MAX_VISUAL_ELEMENTS elements, summary rows otherwise) and the compact
+    pointer trace are sent; the browser works out colors and pointers itself.
     
-    Time Complexity: O(log n) - each step eliminates half the remaining elements
-    Space Complexity: O(1) - only uses a constant amount of extra space
+    Returns:
+        Dictionary with 'rows' ([first, last, first value, last value] per bar),
+        'trace' (low/high/mid/value lists), 'n', 'target', 'index' and 'found'
+    """
+    is_found = (result != -1)
+    if is_found:
+        rows = frame_rows(len(arr), steps.low[-1], steps.high[-1], steps.mid[-1])
+    else:
+        rows = frame_rows(len(arr), 0, -1, None)
     
-    Args:
-        arr: Sorted list of integers to search through
-        target: Integer value to search for
+    return {
+        'n': len(arr),
+        'target': int(target),
+        'index': int(result),
+        'found': is_found,
+        'rows': [[first, last, int(arr[first]), int(arr[last])] for first, last in rows],
+        'trace': {
+            'low': steps.low.tolist(),
+            'high': steps.high.tolist(),
+            'mid': steps.mid.tolist(),
+            'value': [int(value) for value in steps.values],
+        },
+    }
+
+
+def search_trace(array_str, target_str, large_mode=False, array_file=None, engine='binary',
+                 prepared=None):
+    """
+    Runs a search without any server-side rendering.
+    
+    Same as search(), except that instead of a matplotlib figure it returns
+    the JSON payload that the browser draws (see trace_payload and
+    CLIENT_RENDER_JS). Every engine's trace is drawn in array order.
     
     Returns:
-        Tuple of (index, steps) where:
-        - index is position of target (-1 if not found)
-        - steps is a list of dictionaries tracking each iteration
+        Tuple of (payload, result_text, steps_text); payload is None on error
     """
-    steps = []
-    low = 0
-    high = len(arr) - 1
-    comparisons = 0
+    arr, target, error, prepared = session_input(array_str, target_str, large_mode,
+                                                 array_file, prepared)
+    if error:
+        return None, error, ""
     
-    # Main search loop - continues while search space is valid
-    while low <= high:
-        # Calculate midpoint (avoiding integer overflow)
-        mid = (low + high) // 2
-        comparisons += 1
-        
-        # Record current state for visualization
-        steps.append({
-            'low': low,           # Current lower boundary
-            'high': high,         # Current upper boundary
-            'mid': mid,           # Current midpoint being checked
-            'value': arr[mid],    # Value at midpoint
-            'comparison': comparisons,
-            'eliminated': low + (len(arr) - high - 1)  # Track eliminated elements
-        })
-        
-        # Check if we found the target
-        if arr[mid] == target:
-            return mid, steps
-        
-        # Target is in right half - eliminate left half
-        elif arr[mid] < target:
-            low = mid + 1
-        
-        # Target is in left half - eliminate right half
-        else:
-            high = mid - 1
+    result, steps, probes, layout = run_engine(arr, target, engine,
+                                               prepared and prepared.key)
+    is_found = (result != -1)
     
-    # Target not found in array
-    return -1, steps
+    return (trace_payload(arr, target, result, steps),
+            format_result(arr, target, result, steps, probes, layout,
+                          engine, compare_engines(arr, target)),
+            format_steps(steps, target, is_found,
+                         probe_name=PROBE_NAMES.get(engine, 'Midpoint')))
+
 
+# Choices for where the chart is drawn
+SERVER_RENDER = "Server (matplotlib)"
+CLIENT_RENDER = "Browser"
 
-def visualize(arr, step, is_found=False, step_number=1, total_steps=1):
+
+def run_search(array_str, target_str, large_mode=False, array_file=None,
+               render_mode=SERVER_RENDER, engine='binary', prepared=None):
     """
-    Creates a clean bar chart visualization showing the search process.
+    Search button handler: draws the chart on the server or in the browser.
     
-    Uses a horizontal bar layout with clear color coding to show which elements
-    are being examined and which have been eliminated.
+    Layout engines return the same indices and steps as binary_search; only
+    the server renderer draws their storage order, the browser always shows
+    the array itself.
     
-    Args:
-        arr: The array being searched
-        step: Dictionary with current low, high, mid pointers and values
-        is_found: Boolean indicating whether target was found
-        step_number: Current step number
-        total_steps: Total number of steps
+    prepared is the session's PreparedArray (a gr.State); it is reused while
+    the array inputs stay the same and returned so the session keeps it.
     
     Returns:
-        Matplotlib figure object ready to display
+        Tuple of (figure, result_text, steps_text, payload, prepared); only
+        one of figure and payload is set, depending on render_mode
     """
-    fig, ax = plt.subplots(figsize=(14, 6))
+    with metrics.phase('prepare'):
+        prepared = prepare_array(array_str, large_mode, array_file, prepared)
     
-    n = len(arr)
-    low_idx = step['low']
-    high_idx = step['high']
-    mid_idx = step['mid']
+    if render_mode == CLIENT_RENDER:
+        payload, result_msg, steps_text = search_trace(array_str, target_str, large_mode,
+                                                       array_file, engine, prepared)
+        return None, result_msg, steps_text, payload, prepared
     
-    # Determine colors for each bar
-    colors = []
-    for i in range(n):
-        if i < low_idx or i > high_idx:
-            # Eliminated - gray and faded
-            colors.append('#d3d3d3')
-        elif i == mid_idx:
-            # Current midpoint - cyan for checking, green if found
-            colors.append('#00ff88' if is_found else '#00bfff')
-        elif i == low_idx or i == high_idx:
-            # Boundaries - orange
-            colors.append('#ff8c42')
+    plot, result_msg, steps_text = search(array_str, target_str, large_mode, array_file,
+                                          engine, prepared)
+    return plot, result_msg, steps_text, None, prepared
+
+
+# Draws a trace_payload as an SVG bar chart inside the #client-plot element.
+# Mirrors the colors, pointers and titles of the matplotlib frames.
+CLIENT_RENDER_JS = """
+(payload) => {
+    const host = document.querySelector('#client-plot .client-plot-canvas');
+    if (!host) return;
+    if (!payload || !payload.rows) { host.innerHTML = ''; return; }
+
+    const colors = {eliminated: '#d3d3d3', found: '#00ff88',
+                    boundary: '#ff8c42', active: '#ffd93d', notFound: '#ffcccc'};
+    const rows = payload.rows, t = payload.trace, steps = t.mid.length;
+    const found = payload.found, last = steps - 1;
+    const low = found ? t.low[last] : null, high = found ? t.high[last] : null;
+    const mid = found ? t.mid[last] : null;
+
+    const W = 1400, H = 600, left = 190, right = 40, top = 70, bottom = 60;
+    const plotW = W - left - right, plotH = H - top - bottom;
+    const top_value = Math.max(1, ...rows.map(r => r[3]));
+    const xmax = top_value * 1.3;
+    const x = v => left + Math.max(0, v) / xmax * plotW;
+    const rowH = plotH / rows.length;
+    const y = r => top + (rows.length - 1 - r) * rowH + rowH / 2;
+    const esc = s => String(s).replace(/&/g, '&amp;').replace(/</g, '&lt;');
+
+    let svg = `<svg viewBox="0 0 ${W} ${H}" width="100%" xmlns="http://www.w3.org/2000/svg" font-family="sans-serif">`;
+    svg += `<rect width="${W}" height="${H}" fill="white"/>`;
+    let pointers = {};
+    rows.forEach((row, r) => {
+        const [first, last_i, v0, v1] = row;
+        let fill = colors.notFound, stroke = '#cc0000';
+        if (found) {
+            stroke = 'black';
+            if (first < low || first > high) fill = colors.eliminated;
+            else if (first === mid) fill = colors.found;
+            else if (first === low || first === high) fill = colors.boundary;
+            else fill = colors.active;
+        }
+        if (first === last_i) pointers[first] = r;
+        const label = first === last_i ? `[${first}]` : `[${first}-${last_i}]`;
+        const text = first === last_i ? `${v0}` : `${v0}\u2013${v1}`;
+        svg += `<rect x="${left}" y="${y(r) - rowH * 0.35}" width="${x(v1) - left}" height="${rowH * 0.7}" fill="${fill}" stroke="${stroke}" stroke-width="2"/>`;
+        svg += `<text x="${x(v1) + plotW * 0.02 / 1.3}" y="${y(r)}" dominant-baseline="middle" font-size="13" font-weight="bold">${esc(text)}</text>`;
+        svg += `<text x="${left - 8}" y="${y(r)}" dominant-baseline="middle" text-anchor="end" font-size="12">${label}</text>`;
+    });
+    const arrow = (r, label, color, toX, fromX, anchor) => {
+        svg += `<line x1="${fromX}" y1="${y(r)}" x2="${toX}" y2="${y(r)}" stroke="${color}" stroke-width="3"/>`;
+        svg += `<text x="${fromX}" y="${y(r)}" dominant-baseline="middle" text-anchor="${anchor}" font-size="13" font-weight="bold" fill="${color}">${label}</text>`;
+    };
+    if (found) {
+        if (low !== high) {
+            arrow(pointers[low], 'LOW', colors.boundary, left, left - 110, 'end');
+            arrow(pointers[high], 'HIGH', colors.boundary, left, left - 110, 'end');
+        }
+        const mx = x(rows[pointers[mid]][3]);
+        arrow(pointers[mid], 'FOUND!', '#00aa55', mx + 4, mx + plotW * 0.3 / 1.3, 'start');
+    } else {
+        svg += `<text x="${left + plotW / 2}" y="${top + plotH / 2}" text-anchor="middle" dominant-baseline="middle" font-size="40" font-weight="bold" fill="#cc0000" opacity="0.7">TARGET NOT FOUND</text>`;
+    }
+    const title = found
+        ? `FOUND! Target at index ${payload.index} (value = ${t.value[last]})`
+        : `Search Complete: Target ${payload.target} not found after ${steps} comparisons`;
+    svg += `<text x="${left + plotW / 2}" y="35" text-anchor="middle" font-size="18" font-weight="bold" fill="${found ? '#00aa00' : '#cc0000'}">${esc(title)}</text>`;
+    svg += `<line x1="${left}" y1="${top + plotH}" x2="${W - right}" y2="${top + plotH}" stroke="black"/>`;
+    svg += `<line x1="${left}" y1="${top}" x2="${left}" y2="${top + plotH}" stroke="black"/>`;
+    svg += `<text x="${left + plotW / 2}" y="${H - 15}" text-anchor="middle" font-size="15" font-weight="bold">Value</text>`;
+    svg += '</svg>';
+    host.innerHTML = svg;
+}
+"""
+
+
+# Seconds each frame stays on screen when a search is played back
+PLAY_FRAME_DELAY = float(os.environ.get('PLAY_FRAME_DELAY', 0.8))
+
+# Longest search that can be played back, in frames
+MAX_PLAY_FRAMES = int(os.environ.get('MAX_PLAY_FRAMES', 256))
+
+
+def trace_frames(arr, target, result, steps, layout=None, base=None):
+    """
+    Describes every picture of a search's playback, in order.
+    
+    One frame per step, then the "not found" frame if the target is missing
+    (layouts show that on their last step instead). Frames are built as they
+    are asked for.
+    
+    Args:
+        arr: The array that was searched
+        target: The value searched for
+        result: Index returned by the search (-1 if not found)
+        steps: SearchTrace of the search
+        layout: The layout searched, if any; frames then show its storage order
+        base: Optional PreparedArray.base for step_frame and not_found_frame
+    
+    Yields:
+        Frame dictionaries understood by FigureTemplate.draw
+    """
+    is_found = (result != -1)
+    total = len(steps)
+    for i in range(total):
+        if layout is not None:
+            yield layout_frame(layout, steps, is_found, target, shown=i + 1)
         else:
-            # Active search space - yellow
-            colors.append('#ffd93d')
-    
-    # Create horizontal bars
-    y_positions = np.arange(n)
-    bars = ax.barh(y_positions, arr, color=colors, edgecolor='black', linewidth=2, height=0.7)
-    
-    # Add value labels at the end of bars
-    for i, (bar, value) in enumerate(zip(bars, arr)):
-        ax.text(bar.get_width() + max(arr) * 0.02, bar.get_y() + bar.get_height()/2,
-                f'{value}', va='center', fontsize=12, fontweight='bold')
-    
-    # Add index labels on the left
-    ax.set_yticks(y_positions)
-    ax.set_yticklabels([f'[{i}]' for i in range(n)], fontsize=11)
-    
-    # Add pointer annotations
-    pointer_offset = max(arr) * 0.15
-    
-    # Low pointer
-    if low_idx <= high_idx:
-        ax.annotate('LOW', xy=(0, low_idx), xytext=(-pointer_offset, low_idx),
-                   ha='right', va='center', fontsize=11, fontweight='bold',
-                   color='#ff8c42',
-                   bbox=dict(boxstyle='round,pad=0.3', facecolor='#ff8c42', alpha=0.3),
-                   arrowprops=dict(arrowstyle='->', color='#ff8c42', lw=2))
-    
-    # High pointer
-    if low_idx <= high_idx:
-        ax.annotate('HIGH', xy=(0, high_idx), xytext=(-pointer_offset, high_idx),
-                   ha='right', va='center', fontsize=11, fontweight='bold',
-                   color='#ff8c42',
-                   bbox=dict(boxstyle='round,pad=0.3', facecolor='#ff8c42', alpha=0.3),
-                   arrowprops=dict(arrowstyle='->', color='#ff8c42', lw=2))
-    
-    # Mid pointer
-    mid_color = '#00ff88' if is_found else '#00bfff'
-    mid_label = 'FOUND!' if is_found else 'MID'
-    ax.annotate(mid_label, xy=(arr[mid_idx], mid_idx), 
-               xytext=(arr[mid_idx] + pointer_offset * 2, mid_idx),
-               ha='left', va='center', fontsize=12, fontweight='bold',
-               color=mid_color,
-               bbox=dict(boxstyle='round,pad=0.5', facecolor=mid_color, alpha=0.3),
-               arrowprops=dict(arrowstyle='->', color=mid_color, lw=3))
-    
-    # Configure axes
-    ax.set_xlabel('Value', fontsize=13, fontweight='bold')
-    ax.set_ylabel('Index', fontsize=13, fontweight='bold')
+            yield step_frame(arr, steps[i], is_found and i == total - 1, i + 1, total, base)
+    if not is_found and layout is None:
+        yield not_found_frame(arr, target, steps, base)
+
+
+def trace_length(result, steps, layout=None):
+    """Number of frames trace_frames yields for a search."""
+    return len(steps) + (result == -1 and layout is None)
+
+
+def play_search(array_str, target_str, large_mode=False, array_file=None, engine='binary',
+                prepared=None):
+    """
+    Plays a search back one step at a time, as a Gradio generator handler.
     
-    # Title with status
-    if is_found:
-        title_color = '#00aa00'
-        title_text = f'FOUND! Target at index {mid_idx} (value = {step["value"]})'
-    else:
-        title_color = '#333333'
-        title_text = f'Step {step_number}/{total_steps}: Checking index {mid_idx} (value = {step["value"]})'
+    Each step is rendered only when it is about to be shown and is yielded
+    straight away, so the first frame reaches the browser without waiting for
+    the rest of the trace. Nothing keeps earlier frames alive, so at most one
+    rendered frame exists at a time however long the trace is. The step
+    explanations are appended one step per frame, and searches longer than
+    MAX_PLAY_FRAMES frames are refused.
     
-    ax.set_title(title_text, fontsize=14, fontweight='bold', pad=20, color=title_color)
+    Args:
+        array_str: Comma-separated string of integers from user
+        target_str: Target value string from user
+        large_mode: Whether to accept arrays beyond MAX_VISUAL_ELEMENTS
+        array_file: Optional .npy/.csv file used instead of array_str
+        engine: Key of SEARCH_ENGINES, or of SEARCH_LAYOUTS to play the search
+            through that layout's storage order
+        prepared: The session's PreparedArray, reused as in run_search
     
-    ax.grid(axis='x', alpha=0.3, linestyle='--')
-    ax.set_xlim(0, max(arr) * 1.3)
+    Yields:
+        Tuples of (figure, result_text, steps_text, prepared), one per step,
+        then the final result
+    """
+    prepared = prepare_array(array_str, large_mode, array_file, prepared)
+    arr, target, error, _ = session_input(array_str, target_str, large_mode,
+                                          array_file, prepared)
+    if error:
+        yield plot_payload(render_error(error)), error, "", prepared
+        return
     
-    # Add legend
-    legend_elements = [
-        plt.Rectangle((0,0),1,1, fc='#00bfff', ec='black', lw=2, label='Current Check (MID)'),
-        plt.Rectangle((0,0),1,1, fc='#ff8c42', ec='black', lw=2, label='Search Boundaries (LOW/HIGH)'),
-        plt.Rectangle((0,0),1,1, fc='#ffd93d', ec='black', lw=2, label='Active Search Space'),
-        plt.Rectangle((0,0),1,1, fc='#d3d3d3', ec='black', lw=2, label='Eliminated'),
-    ]
-    if is_found:
-        legend_elements[0] = plt.Rectangle((0,0),1,1, fc='#00ff88', ec='black', lw=2, label='FOUND!')
+    result, steps, probes, layout = run_engine(arr, target, engine, prepared.key)
+    count = trace_length(result, steps, layout)
+    if count > MAX_PLAY_FRAMES:
+        error = (f"Error: This search needs {count:,} frames; "
+                 f"playback is limited to {MAX_PLAY_FRAMES:,}")
+        yield plot_payload(render_error(error)), error, "", prepared
+        return
     
-    ax.legend(handles=legend_elements, loc='upper right', fontsize=10, framealpha=0.9)
+    is_found = (result != -1)
+    total = len(steps)
+    probe_name = PROBE_NAMES.get(engine, 'Midpoint')
+    frames = trace_frames(arr, target, result, steps, layout, prepared.base)
+    details = STEPS_HEADER
+    
+    for i in range(total):
+        step = steps[i]
+        last = (i == total - 1)
+        png = render_frame(next(frames))
+        status = (f"## Searching...\n\n**Step {i + 1} of {total}:** checking index "
+                  f"{step.mid} (value = {step.value})\n\n")
+        details += format_step(steps, i, target, is_found, probe_name)
+        yield plot_payload(png), status, details, prepared
+        if not last or not is_found:
+            time.sleep(PLAY_FRAME_DELAY)
     
-    plt.tight_layout()
-    return fig
+    # Finish with the same picture and summary as a normal search
+    for frame in frames:
+        png = render_frame(frame)
+    yield (plot_payload(png),
+           format_result(arr, target, result, steps, probes, layout,
+                         engine, compare_engines(arr, target)),
+           details,
+           prepared)
 
 
-def validate_input(array_str, target_str):
+def gif_frame(png, duration):
     """
-    Validates and parses user input to ensure it meets algorithm requirements.
-    
-    Checks performed:
-    - Input is not empty
-    - All values are valid integers
-    - Array is sorted (required for binary search)
-    - Array size is reasonable for visualization
+    Encodes one PNG frame as a GIF image block with its own palette.
     
     Args:
-        array_str: Comma-separated string of integers
-        target_str: String representation of target integer
+        png: PNG bytes of the frame
+        duration: How long the frame is shown, in milliseconds
     
     Returns:
-        Tuple of (arr, target, error_message)
-        If valid: (list, int, None)
-        If invalid: (None, None, error_string)
+        Tuple of ((width, height), gif_bytes)
     """
-    # Check for empty inputs
-    if not array_str.strip():
-        return None, None, "Error: Please enter an array of numbers"
+    from PIL import GifImagePlugin, Image
     
-    if not target_str.strip():
-        return None, None, "Error: Please enter a target value to search for"
+    with Image.open(io.BytesIO(png)) as image:
+        image = image.convert('RGB').quantize(colors=256)
+    data = GifImagePlugin.getdata(image, duration=duration, include_color_table=True)
+    return image.size, b''.join(data)
+
+
+def export_frame(frame, export_format, duration):
+    """
+    Rendering job for export_trace; runs in a render worker when there is one.
     
-    try:
-        # Parse array from comma-separated string
-        arr = [int(x.strip()) for x in array_str.split(',') if x.strip()]
-        
-        # Parse target value
-        target = int(target_str.strip())
-        
-        # Validate array is not empty
-        if not arr:
-            return None, None, "Error: Array cannot be empty"
-        
-        # Validate array size (keep visualization readable)
-        if len(arr) > 20:
-            return None, None, "Error: Please limit array to 20 elements for clear visualization"
-        
-        # CRITICAL: Check if array is sorted
-        # Binary search ONLY works on sorted arrays
-        if arr != sorted(arr):
-            return None, None, "Error: Array must be sorted in ascending order for binary search to work"
-        
-        # All validation passed
-        return arr, target, None
+    GIF frames are quantized and compressed here too, so that work is
+    spread over the workers as well; other formats get the PNG.
+    
+    Returns:
+        Tuple of (payload, figure_seconds, serialize_seconds), like render_png
+    """
+    png, figure_seconds, serialize_seconds = render_png(frame)
+    if export_format != 'gif':
+        return png, figure_seconds, serialize_seconds
+    start = time.perf_counter()
+    payload = gif_frame(png, duration)
+    return payload, figure_seconds, serialize_seconds + time.perf_counter() - start
+
+
+class GifWriter:
+    """Writes a looping GIF one encoded frame (see gif_frame) at a time."""
+
+    def __init__(self, path):
+        self.file = open(path, 'wb')
+        self.started = False
+
+    def write(self, payload):
+        (width, height), data = payload
+        if not self.started:
+            # No global palette: every frame carries its own
+            self.file.write(b'GIF89a' + struct.pack('<HHBBB', width, height, 0, 0, 0))
+            self.file.write(b'!\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00')  # Loop forever
+            self.started = True
+        self.file.write(data)
+
+    def close(self):
+        with self.file:
+            self.file.write(b';')
+
+
+class VideoWriter:
+    """Pipes PNG frames into ffmpeg, which encodes them as an H.264 MP4."""
+
+    def __init__(self, path, frames_per_second):
+        self.process = subprocess.Popen(
+            ['ffmpeg', '-y', '-loglevel', 'error',
+             '-f', 'image2pipe', '-c:v', 'png', '-framerate', f'{frames_per_second:g}', '-i', '-',
+             '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-c:v', 'libx264', '-pix_fmt', 'yuv420p',
+             '-r', '25', path],
+            stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def write(self, png):
+        self.process.stdin.write(png)
+
+    def close(self):
+        self.process.stdin.close()
+        error = self.process.stderr.read()
+        if self.process.wait():
+            raise OSError(f"ffmpeg failed: {error.decode(errors='replace').strip()}")
+
+
+class SpriteSheetWriter:
+    """
+    Writes frames into one PNG laid out as a grid, row by row.
+    
+    The PNG is compressed as a stream, so only one row of decoded frames is
+    held at a time, never the whole sheet. The grid size is stored in the
+    PNG's Comment text so the frames can be cut out again.
+    """
+
+    def __init__(self, path, count, columns=None):
+        self.file = open(path, 'wb')
+        self.count = count
+        self.columns = columns or max(1, int(np.ceil(np.sqrt(count))))
+        self.row = []
+        self.size = None
+        self.compressor = zlib.compressobj(6)
+
+    def chunk(self, kind, data):
+        self.file.write(struct.pack('>I', len(data)) + kind + data
+                        + struct.pack('>I', zlib.crc32(kind + data)))
+
+    def write(self, png):
+        from PIL import Image
         
-    except ValueError:
-        return None, None, "Error: Please enter valid integers only (no letters or symbols)"
+        with Image.open(io.BytesIO(png)) as image:
+            if self.size is None:
+                self.size = image.size
+                self.start()
+            if image.size != self.size:
+                image = image.resize(self.size)
+            self.row.append(np.asarray(image.convert('RGB')))
+        if len(self.row) == self.columns:
+            self.flush()
 
+    def start(self):
+        width, height = self.size
+        rows = -(-self.count // self.columns)
+        self.file.write(b'\x89PNG\r\n\x1a\n')
+        self.chunk(b'IHDR', struct.pack('>IIBBBBB', width * self.columns, height * rows,
+                                        8, 2, 0, 0, 0))
+        self.chunk(b'tEXt', (f'Comment\0frames={self.count} columns={self.columns} '
+                             f'frame_width={width} frame_height={height}').encode())
+
+    def flush(self):
+        """Compresses the current row of frames, padding it with white cells."""
+        width, height = self.size
+        block = np.full((height, width * self.columns, 3), 255, dtype=np.uint8)
+        for k, frame in enumerate(self.row):
+            block[:, k * width:(k + 1) * width] = frame
+        # Every scanline starts with filter type 0 (none)
+        lines = np.concatenate([np.zeros((height, 1), dtype=np.uint8),
+                                block.reshape(height, -1)], axis=1)
+        data = self.compressor.compress(lines.tobytes())
+        if data:
+            self.chunk(b'IDAT', data)
+        self.row = []
+
+    def close(self):
+        with self.file:
+            if self.row:
+                self.flush()
+            self.chunk(b'IDAT', self.compressor.flush())
+            self.chunk(b'IEND', b'')
 
-def generate_random_array():
-    """Generate a random sorted array for demonstration."""
-    size = random.randint(6, 12)
-    start = random.randint(1, 20)
-    step = random.randint(2, 5)
-    arr = [start + i * step for i in range(size)]
-    return ', '.join(map(str, arr))
 
+# Formats the whole trace can be exported to; MP4 needs ffmpeg on the PATH
+EXPORT_CHOICES = [
+    ("GIF animation", 'gif'),
+    ("MP4 video", 'mp4'),
+    ("PNG sprite sheet", 'sprites'),
+]
+EXPORT_EXTENSIONS = {'gif': '.gif', 'mp4': '.mp4', 'sprites': '.png'}
 
-def search(array_str, target_str):
+# Longest trace that can be exported (interpolation search on skewed data
+# can take a step per element)
+MAX_EXPORT_FRAMES = int(os.environ.get('MAX_EXPORT_FRAMES', 512))
+
+# Where exports are written (a temporary directory by default), and how many
+# are kept there; Gradio serves its own copy of each download. Only files
+# named EXPORT_PREFIX* are ever removed, so EXPORT_DIR may be shared.
+EXPORT_DIR = os.environ.get('EXPORT_DIR')
+MAX_EXPORT_FILES = int(os.environ.get('MAX_EXPORT_FILES', 16))
+EXPORT_PREFIX = 'search-trace-'
+
+_export_lock = threading.Lock()
+
+
+def export_path(export_format):
     """
-    Main search function that coordinates the entire process.
+    Returns a new file path for an export, removing the oldest exports.
     
-    This function:
-    1. Validates user input
-    2. Executes the binary search algorithm
-    3. Generates the visualization
-    4. Formats the output for display
+    Only earlier exports (EXPORT_PREFIX names with an export extension) are
+    counted and removed; other files in EXPORT_DIR are left alone.
+    """
+    global EXPORT_DIR
+    with _export_lock:
+        if EXPORT_DIR is None:
+            EXPORT_DIR = tempfile.mkdtemp(prefix='search-exports-')
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        extensions = tuple(EXPORT_EXTENSIONS.values())
+        exports = sorted((entry for entry in os.scandir(EXPORT_DIR)
+                          if entry.name.startswith(EXPORT_PREFIX)
+                          and entry.name.endswith(extensions) and entry.is_file()),
+                         key=lambda entry: entry.stat().st_mtime)
+        for entry in exports[:max(0, len(exports) - MAX_EXPORT_FILES + 1)]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        handle, path = tempfile.mkstemp(prefix=EXPORT_PREFIX,
+                                        suffix=EXPORT_EXTENSIONS[export_format], dir=EXPORT_DIR)
+        os.close(handle)
+    return path
+
+
+def export_trace(arr, target, result, steps, path, export_format='gif', layout=None,
+                 base=None, frame_delay=None):
+    """
+    Renders every frame of a search and encodes them into one file.
+    
+    Frames are rendered in the render pool when one is running (see
+    render_jobs), a few at a time per worker, and written to the encoder
+    in order as they arrive, so memory use does not grow with the length
+    of the trace.
     
     Args:
-        array_str: Comma-separated string of integers from user
-        target_str: Target value string from user
+        arr, target, result, steps, layout, base: As for trace_frames
+        path: File to write
+        export_format: 'gif', 'mp4' (needs ffmpeg) or 'sprites' (a PNG
+            sprite sheet)
+        frame_delay: Seconds per frame in animations (PLAY_FRAME_DELAY by
+            default); the last frame is held three times as long in GIFs
     
     Returns:
-        Tuple of (figure, result_text, steps_text)
-        - figure: Matplotlib visualization
-        - result_text: Summary of search results
-        - steps_text: Detailed step-by-step breakdown
+        Number of frames written
     """
-    # Step 1: Validate and parse input
-    arr, target, error = validate_input(array_str, target_str)
+    frame_delay = PLAY_FRAME_DELAY if frame_delay is None else frame_delay
+    count = trace_length(result, steps, layout)
+    duration = max(20, round(frame_delay * 1000))
+    items = ((frame, export_format, 3 * duration if i == count - 1 else duration)
+             for i, frame in enumerate(trace_frames(arr, target, result, steps, layout, base)))
     
-    if error:
-        # Create error visualization
-        fig, ax = plt.subplots(figsize=(10, 4))
-        ax.text(0.5, 0.5, error, ha='center', va='center', 
-                fontsize=14, color='red', transform=ax.transAxes, wrap=True)
-        ax.axis('off')
-        plt.tight_layout()
-        return fig, error, ""
+    if export_format == 'gif':
+        writer = GifWriter(path)
+    elif export_format == 'mp4':
+        writer = VideoWriter(path, 1 / max(frame_delay, 0.02))
+    else:
+        writer = SpriteSheetWriter(path, count)
+    try:
+        for payload in render_jobs(export_frame, items):
+            writer.write(payload)
+    finally:
+        writer.close()
+    return count
+
+
+def export_search(array_str, target_str, large_mode=False, array_file=None, engine='binary',
+                  export_format='gif', prepared=None):
+    """
+    Export button handler: writes the whole trace of a search to a file.
     
-    # Step 2: Execute binary search
-    result, steps = binary_search(arr, target)
+    Args:
+        array_str, target_str, large_mode, array_file, engine, prepared: As
+            for play_search
+        export_format: Key of EXPORT_EXTENSIONS
     
-    # Step 3: Generate visualization of the final step
-    is_found = (result != -1)
+    Returns:
+        Tuple of (file_path, message, prepared); file_path is None on error
+    """
+    prepared = prepare_array(array_str, large_mode, array_file, prepared)
+    arr, target, error, _ = session_input(array_str, target_str, large_mode,
+                                          array_file, prepared)
+    if error:
+        return None, error, prepared
+    if export_format == 'mp4' and shutil.which('ffmpeg') is None:
+        return None, "Error: MP4 export needs ffmpeg, which is not installed here", prepared
     
-    # For "not found" cases, create a special visualization
-    if not is_found:
-        fig, ax = plt.subplots(figsize=(14, 6))
-        
-        # Show the final state with clear "NOT FOUND" message
-        n = len(arr)
-        y_positions = np.arange(n)
-        colors = ['#ffcccc'] * n  # Light red for all elements
-        
-        bars = ax.barh(y_positions, arr, color=colors, edgecolor='#cc0000', linewidth=2, height=0.7)
-        
-        # Add value labels
-        for i, (bar, value) in enumerate(zip(bars, arr)):
-            ax.text(bar.get_width() + max(arr) * 0.02, bar.get_y() + bar.get_height()/2,
-                    f'{value}', va='center', fontsize=12, fontweight='bold')
-        
-        # Add index labels
-        ax.set_yticks(y_positions)
-        ax.set_yticklabels([f'[{i}]' for i in range(n)], fontsize=11)
-        
-        # Big "NOT FOUND" overlay
-        ax.text(max(arr) * 0.5, n/2, 'TARGET NOT FOUND', 
-            ha='center', va='center', fontsize=32, fontweight='bold',
-            color='#cc0000', alpha=0.7,
-            bbox=dict(boxstyle='round,pad=1', facecolor='white', 
-                        edgecolor='#cc0000', linewidth=4, alpha=0.9))
-        
-        ax.set_xlabel('Value', fontsize=13, fontweight='bold')
-        ax.set_ylabel('Index', fontsize=13, fontweight='bold')
-        ax.set_title(f'Search Complete: Target {target} not found after {len(steps)} comparisons', 
-                    fontsize=14, fontweight='bold', pad=20, color='#cc0000')
-        ax.grid(axis='x', alpha=0.3, linestyle='--')
-        ax.set_xlim(0, max(arr) * 1.3)
-        
-        plt.tight_layout()
-    else:
-        fig = visualize(arr, steps[-1], is_found, len(steps), len(steps))
+    result, steps, _, layout = run_engine(arr, target, engine, prepared.key)
+    count = trace_length(result, steps, layout)
+    if count > MAX_EXPORT_FRAMES:
+        return None, (f"Error: This search needs {count:,} frames; "
+                      f"exports are limited to {MAX_EXPORT_FRAMES:,} frames"), prepared
+    
+    path = export_path(export_format)
+    with metrics.phase('export'):
+        try:
+            export_trace(arr, target, result, steps, path, export_format, layout, prepared.base)
+        except OSError as error:
+            return None, f"Error: Export failed ({error})", prepared
+    size = os.path.getsize(path)
+    return path, f"Exported {count} frames ({size / 1024:,.0f} KB)", prepared
+
+
+# Number of search requests the app will handle at the same time
+SEARCH_CONCURRENCY = int(os.environ.get('SEARCH_CONCURRENCY', 8))
+
+# Seconds a session's prepared array is kept after its last search
+PREPARED_TTL = float(os.environ.get('PREPARED_TTL', 3600))
+
+# How matplotlib is readied when the server starts: 'lazy' (on the first
+# figure), 'background' (warm up in a thread while the server starts) or
+# 'eager' (warm up before the server starts)
+STARTUP_MODE = os.environ.get('STARTUP_MODE', 'background')
+
+
+def prepare_startup(mode=STARTUP_MODE):
+    """
+    Readies rendering for the first request according to mode.
     
-    # Step 4: Format result message
-    result_msg = "## Search Complete\n\n"
+    Warm-up loads matplotlib and draws a sample chart and error figure (see
+    warm_renderer). It is skipped when a render pool is running, because the
+    workers warm themselves.
     
-    if result != -1:
-        result_msg += f"**Status:** Target found\n\n"
-        result_msg += f"**Location:** Index {result} (value = {arr[result]})\n\n"
-        result_msg += f"**Efficiency:** Found in {len(steps)} comparison(s)\n\n"
-    else:
-        result_msg += f"**Status:** Target not found\n\n"
-        result_msg += f"**Comparisons:** {len(steps)} check(s) performed\n\n"
-        result_msg += f"**Conclusion:** {target} is not present in this array\n\n"
+    Returns:
+        The warm-up thread in 'background' mode, otherwise None
+    """
+    if mode not in ('lazy', 'background', 'eager'):
+        raise ValueError(f"Unknown STARTUP_MODE {mode!r} (use lazy, background or eager)")
+    if mode == 'lazy' or render_pool is not None:
+        return None
     
-    # Add efficiency metrics
-    max_comparisons = int(np.log2(len(arr))) + 1 if len(arr) > 0 else 0
-    efficiency = ((len(arr) - len(steps)) / len(arr) * 100) if len(arr) > 0 else 0
-    
-    result_msg += "### Algorithm Performance\n\n"
-    result_msg += f"- Array size: {len(arr)} elements\n"
-    result_msg += f"- Comparisons made: {len(steps)}\n"
-    result_msg += f"- Maximum possible: {max_comparisons}\n"
-    result_msg += f"- Efficiency gain: {efficiency:.1f}% fewer checks than linear search\n"
-    
-    # Step 5: Format detailed step-by-step execution
-    steps_text = "## Step-by-Step Execution\n\n"
-    
-    for i, step in enumerate(steps, 1):
-        steps_text += f"### Step {i}\n\n"
-        steps_text += f"**Search Range:** indices {step['low']} to {step['high']} "
-        steps_text += f"({step['high'] - step['low'] + 1} elements)\n\n"
-        steps_text += f"**Midpoint:** index {step['mid']}\n\n"
-        steps_text += f"**Value checked:** {step['value']}\n\n"
-        
-        # Explain what happens next
-        if i == len(steps) and is_found:
-            steps_text += f"**Result:** {step['value']} = {target} → **Target found!**\n\n"
-        elif i < len(steps):
-            next_step = steps[i]
-            if step['value'] < target:
-                steps_text += f"**Decision:** {step['value']} < {target}\n\n"
-                steps_text += f"→ Search RIGHT half (indices {next_step['low']} to {next_step['high']})\n\n"
-            else:
-                steps_text += f"**Decision:** {step['value']} > {target}\n\n"
-                steps_text += f"→ Search LEFT half (indices {next_step['low']} to {next_step['high']})\n\n"
-        elif not is_found:
-            steps_text += f"**Decision:** Search space exhausted → **Target not found**\n\n"
-        
-        steps_text += "---\n\n"
+    def warm_up():
+        start = time.perf_counter()
+        warm_renderer()
+        metrics.set_startup('warm_up', time.perf_counter() - start)
     
-    return fig, result_msg, steps_text
+    if mode == 'eager':
+        warm_up()
+        return None
+    thread = threading.Thread(target=warm_up, name='warm-up', daemon=True)
+    thread.start()
+    return thread
+
 
+def startup_report():
+    """Returns the start-up stages recorded so far as one line of text."""
+    stages = ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in metrics.startup.items())
+    return f"Start-up ({STARTUP_MODE}): {stages}"
+
+
+UI_STARTED = time.perf_counter()
 
 
 with gr.Blocks(title="Binary Search Visualizer") as app:
@@ -436,6 +3291,11 @@ with gr.Blocks(title="Binary Search Visualizer") as app:
                 value="2, 5, 8, 12, 16, 23, 38, 45, 56, 67",
                 info="Enter numbers in ascending order, separated by commas"
             )
+            file_input = gr.File(
+                label="Or upload a sorted array (.npy or .csv)",
+                file_types=[".npy", ".csv"],
+                type="filepath"
+            )
         with gr.Column(scale=1):
             target_input = gr.Textbox(
                 label="Target Value",
@@ -443,19 +3303,59 @@ with gr.Blocks(title="Binary Search Visualizer") as app:
                 value="23",
                 info="Number to search for"
             )
+            large_mode_input = gr.Checkbox(
+                label="Large-array mode",
+                value=False,
+                info=f"Allow up to {MAX_LARGE_ELEMENTS:,} elements (drawn in summary bars)"
+            )
+            engine_input = gr.Dropdown(
+                ENGINE_CHOICES,
+                value='binary',
+                label="Search engine",
+                info="Every engine's comparisons are listed under Algorithm Performance; "
+                     "layouts are drawn in storage order"
+            )
     
     # Buttons
     with gr.Row():
         random_btn = gr.Button("Generate Random Example", variant="secondary", size="lg")
         search_btn = gr.Button("Search", variant="primary", size="lg")
+        play_btn = gr.Button("Play Step-by-Step", variant="primary", size="lg")
+    
+    render_mode_input = gr.Radio(
+        [SERVER_RENDER, CLIENT_RENDER],
+        value=SERVER_RENDER,
+        label="Draw the chart on",
+        info="Browser mode sends only the array and the step trace and draws them locally"
+    )
     
     # Output section
-    plot_output = gr.Plot(label="Algorithm Visualization")
+    plot_output = png_plot(label="Algorithm Visualization")
+    client_plot = gr.HTML('<div class="client-plot-canvas"></div>', elem_id="client-plot")
+    trace_output = gr.JSON(visible=False)
+    # This session's PreparedArray, kept between searches on the same array
+    prepared_state = gr.State(time_to_live=PREPARED_TTL)
     
     with gr.Row():
         result_output = gr.Markdown(label="Results")
         steps_output = gr.Markdown(label="Execution Details")
     
+    # Export of the whole trace for offline use
+    with gr.Row(equal_height=True):
+        export_format_input = gr.Dropdown(
+            [(name, key) for name, key in EXPORT_CHOICES
+             if key != 'mp4' or shutil.which('ffmpeg') is not None],
+            value='gif',
+            label="Export format",
+            info=(f"Every step of the search, rendered in parallel by {RENDER_WORKERS} "
+                  "render worker(s)" if RENDER_WORKERS > 0 else
+                  "Every step of the search, rendered one frame at a time "
+                  "(set RENDER_WORKERS to render in parallel)")
+        )
+        export_btn = gr.Button("Export Trace", variant="secondary")
+        export_output = gr.File(label="Download", interactive=False)
+    export_status = gr.Markdown()
+    
     # Educational footer
     gr.HTML("""
     <div class="info-box" style="margin-top: 2rem;">
@@ -480,10 +3380,38 @@ with gr.Blocks(title="Binary Search Visualizer") as app:
     gr.Markdown("*CISC-121 Final Project | Joshua M. Ranin (20457769) | Queen's University*")
     
     # Connect buttons
+    # Rendering no longer touches pyplot, so searches can run in parallel
     search_btn.click(
-        fn=search,
-        inputs=[array_input, target_input],
-        outputs=[plot_output, result_output, steps_output]
+        fn=run_search,
+        inputs=[array_input, target_input, large_mode_input, file_input, render_mode_input,
+                engine_input, prepared_state],
+        outputs=[plot_output, result_output, steps_output, trace_output, prepared_state],
+        concurrency_limit=SEARCH_CONCURRENCY,
+        api_name="search"
+    ).then(
+        # Browser mode: draw the returned trace (clears the chart otherwise)
+        fn=None,
+        inputs=[trace_output],
+        outputs=None,
+        js=CLIENT_RENDER_JS
+    )
+    
+    # Streams one frame per step as it is rendered
+    play_btn.click(
+        fn=play_search,
+        inputs=[array_input, target_input, large_mode_input, file_input, engine_input,
+                prepared_state],
+        outputs=[plot_output, result_output, steps_output, prepared_state],
+        concurrency_limit=SEARCH_CONCURRENCY
+    )
+    
+    # One export at a time: each already keeps every render worker busy
+    export_btn.click(
+        fn=export_search,
+        inputs=[array_input, target_input, large_mode_input, file_input, engine_input,
+                export_format_input, prepared_state],
+        outputs=[export_output, export_status, prepared_state],
+        concurrency_limit=1
     )
     
     random_btn.click(
@@ -491,8 +3419,31 @@ with gr.Blocks(title="Binary Search Visualizer") as app:
         inputs=[],
         outputs=[array_input]
     )
+    
+    # A different array makes the prepared one useless; drop it straight
+    # away rather than holding it until the next search
+    for array_source in (array_input, file_input, large_mode_input):
+        array_source.change(
+            fn=lambda: None,
+            inputs=None,
+            outputs=[prepared_state],
+            queue=False,
+            show_progress="hidden",
+            api_name=False
+        )
+
+
+metrics.set_startup('ui', time.perf_counter() - UI_STARTED)
 
 
 # Launch the application
 if __name__ == "__main__":
-    app.launch()
\ No newline at end of file
+    # Fork the render workers before the server starts any threads
+    start_render_pool()
+    prepare_startup()
+    print(startup_report())
+    try:
+        # SERVER_ROUTES adds /metrics and the /api/search batch API to the same server
+        app.queue().launch(app_kwargs={'routes': SERVER_ROUTES})
+    finally:
+        stop_render_pool()
\ No newline at end of file
@@ -0,0 +1,1026 @@
+"""
+Benchmark and verification script for the Binary Search Visualizer.
+
+Checks the vectorized batch engine against the reference binary_search
+implementation and compares how long each takes to answer many queries.
+
+Usage:
+    python benchmark.py check [--size N] [--queries M] [--seed S]
+    python benchmark.py allocations [--size N] [--queries M]
+    python benchmark.py soak [--requests N] [--threads T] [--max-growth MB]
+    python benchmark.py phases [--sizes N ...] [--repeat R] [--output FILE]
+                               [--baseline FILE]
+    python benchmark.py compare BASELINE CURRENT [--threshold FRACTION]
+    python benchmark.py render [--workers N ...] [--requests N] [--threads T]
+    python benchmark.py startup [--modes MODE ...] [--runs N] [--delay S]
+                                [--output FILE] [--baseline FILE]
+    python benchmark.py layouts [--size N] [--queries M] [--seed S]
+    python benchmark.py engines [--size N] [--queries M] [--seed S]
+    python benchmark.py export [--workers N ...] [--formats F ...] [--size N]
+    python benchmark.py api
+    python benchmark.py behaviour [--seed S]
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib
+import numpy as np
+
+from app import (API_MAX_SCALAR_TARGETS, ENGINE_NAMES, LOD_ROWS, MAX_LARGE_ELEMENTS,
+                 MAX_VISUAL_ELEMENTS, SEARCH_ENGINES, SEARCH_LAYOUTS, SERVER_ROUTES,
+                 ProbeCounter, ResultCache, batch_search, binary_search, export_trace,
+                 format_result, format_steps, generate_random_array, has_blank_entry,
+                 lod_rows, not_found_frame, parse_array, prepare_array,
+                 render_error, render_frame, result_cache, search, start_render_pool,
+                 step_frame, stop_render_pool, validate_input, warm_renderer)
+
+
+def make_dataset(size, queries, seed=0, duplicates=False):
+    """
+    Builds a sorted array and a mix of present and absent targets.
+
+    Args:
+        size: Number of elements in the sorted array
+        queries: Number of targets to generate
+        seed: Random seed so runs are reproducible
+        duplicates: If True, draw values from a small range so many repeat
+
+    Returns:
+        Tuple of (arr, targets) as int64 NumPy arrays
+    """
+    rng = np.random.default_rng(seed)
+    high = max(size // 4, 1) if duplicates else size * 10
+    arr = np.sort(rng.integers(0, high, size=size, dtype=np.int64))
+    # Half the targets come from the array, the rest are random (mostly misses)
+    present = rng.choice(arr, size=queries // 2) if size else np.empty(0, np.int64)
+    absent = rng.integers(-5, high + 5, size=queries - len(present), dtype=np.int64)
+    targets = np.concatenate([present, absent])
+    rng.shuffle(targets)
+    return arr, targets
+
+
+def check_batch_search(arr, targets):
+    """
+    Verifies batch_search returns exactly what binary_search returns.
+
+    Compares the index, the number of comparisons and every low/high/mid
+    pointer of the trace for each target.
+
+    Returns:
+        Number of mismatching targets (0 means the engines agree)
+    """
+    indices, probes, trace = batch_search(arr, targets, return_probes=True,
+                                          return_trace=True)
+    values = arr.tolist()
+    mismatches = 0
+
+    for i, target in enumerate(targets.tolist()):
+        expected, steps = binary_search(values, target)
+        count = len(steps)
+        ok = (indices[i] == expected and probes[i] == count
+              and trace['low'][i, :count].tolist() == steps.low.tolist()
+              and trace['high'][i, :count].tolist() == steps.high.tolist()
+              and trace['mid'][i, :count].tolist() == steps.mid.tolist()
+              and (trace['mid'][i, count:] == -1).all())
+        if not ok:
+            mismatches += 1
+            print(f"  mismatch for target {target}: batch={indices[i]} reference={expected}")
+    return mismatches
+
+
+def check_layout(layout, arr, targets, scalar_limit=2_000):
+    """
+    Verifies a layout answers exactly like binary_search.
+
+    The batch search must return the same index and probe count for every
+    target, and the scalar search the same trace for the first scalar_limit.
+
+    Returns:
+        Number of mismatching targets (0 means the engines agree)
+    """
+    expected, expected_probes = batch_search(arr, targets, return_probes=True)
+    indices, probes = layout.batch_search(targets, return_probes=True)
+    mismatches = int(np.count_nonzero((indices != expected) | (probes != expected_probes)))
+
+    values = arr.tolist()
+    for target in targets[:scalar_limit].tolist():
+        index, steps = binary_search(values, target)
+        layout_index, layout_steps = layout.search(target)
+        if (index != layout_index or steps.pointers != layout_steps.pointers
+                or steps.values != layout_steps.values):
+            mismatches += 1
+            print(f"  mismatch for target {target}: layout={layout_index} reference={index}")
+    return mismatches
+
+
+def legacy_binary_search(arr, target):
+    """
+    The original dictionary-per-step binary_search, kept as a baseline.
+
+    Used only to measure how much the SearchTrace representation saves.
+    """
+    steps = []
+    low = 0
+    high = len(arr) - 1
+    comparisons = 0
+    while low <= high:
+        mid = (low + high) // 2
+        comparisons += 1
+        steps.append({
+            'low': low,
+            'high': high,
+            'mid': mid,
+            'value': arr[mid],
+            'comparison': comparisons,
+            'eliminated': low + (len(arr) - high - 1)
+        })
+        if arr[mid] == target:
+            return mid, steps
+        elif arr[mid] < target:
+            low = mid + 1
+        else:
+            high = mid - 1
+    return -1, steps
+
+
+def measure_allocations(fn, values, queries):
+    """
+    Measures memory allocated by fn(values, target) for each target.
+
+    Returns:
+        Tuple of (bytes kept per call, peak bytes per call, seconds per call).
+        "Kept" is the size of the returned trace, which lives as long as the
+        caller holds on to it.
+    """
+    results = []
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    for target in queries:
+        results.append(fn(values, target))
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Subtract the list holding the results, which is not part of any trace
+    kept -= base + sys.getsizeof(results)
+    elapsed = time_call(lambda: [fn(values, target) for target in queries])
+    count = len(queries)
+    return kept / count, (peak - base) / count, elapsed / count
+
+
+def time_samples(fn, repeat=3, setup=None):
+    """
+    Runs fn() several times and returns each wall-clock time in seconds.
+
+    setup(), if given, runs untimed before every call (e.g. to clear a cache).
+    """
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def time_call(fn, repeat=3):
+    """Returns the best wall-clock time of fn() over several runs, in seconds."""
+    return min(time_samples(fn, repeat))
+
+
+def run_check(args):
+    """Checks batch_search against binary_search and times both engines."""
+    failures = 0
+    cases = [(0, 5), (1, 5), (2, 10), (args.size, args.queries)]
+
+    for size, queries in cases:
+        for duplicates in (False, True):
+            arr, targets = make_dataset(size, queries, args.seed, duplicates)
+            bad = check_batch_search(arr, targets)
+            label = 'duplicates' if duplicates else 'distinct'
+            print(f"n={size:>8} targets={queries:>6} ({label}): "
+                  f"{'OK' if not bad else f'{bad} mismatches'}")
+            failures += bad
+
+    arr, targets = make_dataset(args.size, args.queries, args.seed)
+    values, queries = arr.tolist(), targets.tolist()
+    loop_time = time_call(lambda: [binary_search(values, t) for t in queries])
+    batch_time = time_call(lambda: batch_search(arr, targets))
+    print(f"\nbinary_search loop: {loop_time * 1000:9.2f} ms")
+    print(f"batch_search:       {batch_time * 1000:9.2f} ms "
+          f"({loop_time / batch_time:.1f}x faster)")
+    return 1 if failures else 0
+
+
+def run_layouts(args):
+    """Checks the layout engines against binary_search and times every engine."""
+    failures = 0
+    sizes = [0, 1, 2, 3, 7, 8, 9, 20, 1000, 4097, args.size]
+    for size in sizes:
+        for duplicates in (False, True):
+            arr, targets = make_dataset(size, min(args.queries, 5_000), args.seed, duplicates)
+            for engine, layout_class in SEARCH_LAYOUTS.items():
+                failures += check_layout(layout_class(arr), arr, targets)
+    print(f"layouts agree with binary_search on {len(sizes)} sizes: "
+          f"{'OK' if not failures else f'{failures} mismatches'}\n")
+
+    arr, targets = make_dataset(args.size, args.queries, args.seed)
+    values, queries = arr.tolist(), targets.tolist()
+    sample = queries[:10_000]
+    print(f"n={args.size}, {args.queries} targets ({len(sample)} for the scalar loop)\n")
+    print(f"{'engine':<22}{'build':>10}{'batch':>12}{'per target':>12}{'scalar':>12}")
+
+    scalar = time_call(lambda: [binary_search(values, t, record=False) for t in sample])
+    batch = time_call(lambda: batch_search(arr, targets))
+    print(f"{'binary_search':<22}{'-':>10}{batch * 1000:>10.1f}ms"
+          f"{batch / args.queries * 1e9:>10.0f}ns{scalar / len(sample) * 1e6:>10.2f}us")
+    for engine, layout_class in SEARCH_LAYOUTS.items():
+        start = time.perf_counter()
+        layout = layout_class(arr)
+        build = time.perf_counter() - start
+        layout_batch = time_call(lambda: layout.batch_search(targets))
+        layout_scalar = time_call(lambda: [layout.search(t, record=False) for t in sample])
+        print(f"{layout.name + ' layout':<22}{build * 1000:>8.0f}ms{layout_batch * 1000:>10.1f}ms"
+              f"{layout_batch / args.queries * 1e9:>10.0f}ns"
+              f"{layout_scalar / len(sample) * 1e6:>10.2f}us  ({batch / layout_batch:.2f}x batch)")
+    return 1 if failures else 0
+
+
+def run_engines(args):
+    """
+    Compares comparisons, element reads and time per query of every search
+    engine on uniformly spaced and on skewed (exponential) keys.
+    """
+    rng = np.random.default_rng(args.seed)
+    datasets = {
+        'uniform': np.sort(rng.integers(0, args.size * 10, size=args.size)),
+        'skewed': np.sort(rng.exponential(1e6, size=args.size).astype(np.int64)),
+    }
+    failures = 0
+    for label, arr in datasets.items():
+        values = arr.tolist()
+        present = set(values)
+        targets = np.concatenate([rng.choice(arr, args.queries // 2),
+                                  rng.integers(arr[0], arr[-1] + 1, args.queries // 2)]).tolist()
+        print(f"{label} keys, n={args.size}, {len(targets)} targets (half present)")
+        print(f"{'engine':<16}{'comparisons':>13}{'max':>6}{'reads':>10}{'time':>12}")
+        for engine, search_fn in SEARCH_ENGINES.items():
+            comparisons, reads = [], []
+            for target in targets:
+                counter = ProbeCounter(arr)
+                index, steps = search_fn(counter, target, record=False)
+                if (index == -1) != (target not in present) or (index != -1 and values[index] != target):
+                    failures += 1
+                comparisons.append(len(steps))
+                reads.append(counter.elements)
+            elapsed = time_call(lambda: [search_fn(values, t, record=False) for t in targets])
+            print(f"{engine:<16}{statistics.mean(comparisons):>13.2f}{max(comparisons):>6}"
+                  f"{statistics.mean(reads):>10.2f}{elapsed / len(targets) * 1e6:>10.2f}us")
+        print()
+    print(f"results: {'OK' if not failures else f'{failures} wrong answers'}")
+    return 1 if failures else 0
+
+
+def run_allocations(args):
+    """Compares per-call allocations of the dict, compact and no-trace modes."""
+    arr, targets = make_dataset(args.size, args.queries)
+    values, queries = arr.tolist(), targets.tolist()
+    modes = [
+        ('dict per step (old)', legacy_binary_search),
+        ('SearchTrace', binary_search),
+        ('record=False', lambda a, t: binary_search(a, t, record=False)),
+    ]
+
+    print(f"n={args.size}, {args.queries} searches\n")
+    print(f"{'mode':<22}{'kept/call':>12}{'peak/call':>12}{'time/call':>12}")
+    baseline = None
+    for name, fn in modes:
+        kept, peak, seconds = measure_allocations(fn, values, queries)
+        baseline = baseline or kept
+        print(f"{name:<22}{kept:>10.0f} B{peak:>10.0f} B{seconds * 1e6:>9.2f} us"
+              f"   ({kept / baseline:.0%} of old)")
+    return 0
+
+
+def current_rss_mb():
+    """Returns the resident set size of this process in megabytes."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Peak RSS is the best portable fallback (kilobytes on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def soak_request(i):
+    """One search() call with a mix of found, not-found and invalid inputs."""
+    kind = i % 10
+    if kind == 9:
+        return search("5, 3, 1", "3")  # Unsorted input (error figure)
+    array_str = generate_random_array()
+    values = [int(x) for x in array_str.split(',')]
+    target = random.choice(values) if kind < 6 else values[0] - 1
+    return search(array_str, str(target))
+
+
+def run_soak(args):
+    """
+    Runs many concurrent search() calls and checks memory stays flat.
+    
+    RSS is sampled after each batch, once the garbage collector has run.
+    Before the first sample every thread builds a template of every figure
+    shape the soak draws (and fills the font caches), and the result cache
+    is switched off: its LRU legitimately grows up to its byte limit, which
+    would otherwise read as a leak. Growth is measured from the first batch.
+    """
+    batch = max(args.requests // 10, 1)
+    samples = []
+    cache_entries = result_cache.max_entries
+    result_cache.clear()
+    result_cache.max_entries = 0
+    start = time.perf_counter()
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            for _ in range(2):
+                list(pool.map(lambda _: warm_renderer(), range(args.threads)))
+            for done in range(0, args.requests, batch):
+                end = min(done + batch, args.requests)
+                list(pool.map(soak_request, range(done, end)))
+                gc.collect()
+                samples.append(current_rss_mb())
+                print(f"{end:>7} requests  RSS {samples[-1]:8.1f} MB", flush=True)
+    finally:
+        result_cache.max_entries = cache_entries
+
+    elapsed = time.perf_counter() - start
+    growth = max(samples[1:] or samples) - samples[0]
+    print(f"\n{args.requests / elapsed:.1f} requests/s on {args.threads} threads, "
+          f"RSS growth after warm-up: {growth:.1f} MB")
+    if growth > args.max_growth:
+        print(f"FAIL: RSS grew more than {args.max_growth} MB")
+        return 1
+    return 0
+
+
+def phase_inputs(size, case):
+    """
+    Builds the textbox inputs for one phases benchmark case.
+
+    Cases are 'found' (a target in the middle of the array), 'not_found'
+    (a value between two elements) and 'error' (the last two elements swapped,
+    so validation rejects the array as unsorted).
+
+    Returns:
+        Tuple of (array_str, target_str, large_mode)
+    """
+    arr = np.arange(size, dtype=np.int64) * 3
+    target = int(arr[size // 3])
+    if case == 'not_found':
+        target += 1
+    elif case == 'error' and size > 1:
+        arr[-2], arr[-1] = arr[-1], arr[-2]
+    array_str = ','.join(map(str, arr.tolist()))
+    return array_str, str(target), size > MAX_VISUAL_ELEMENTS
+
+
+def phase_timings(size, case, repeat):
+    """
+    Times each phase of a search() request, then the whole call.
+
+    Phases follow search(): 'parse' (validate_input), 'search'
+    (binary_search), 'render' (frame build and PNG), 'format' (the Markdown
+    result and steps), 'total' (search() itself with the result cache
+    cleared before each run) and 'prepared' (the same, but repeating a
+    search on an array the session has already prepared). Error cases only
+    have 'parse', 'render' (the error figure), 'total' and 'prepared'.
+
+    Returns:
+        Dictionary of phase name -> list of seconds per run
+    """
+    array_str, target_str, large_mode = phase_inputs(size, case)
+    arr, target, error = validate_input(array_str, target_str, large_mode)
+    timings = {'parse': time_samples(
+        lambda: validate_input(array_str, target_str, large_mode), repeat)}
+
+    if error:
+        timings['render'] = time_samples(lambda: render_error(error), repeat)
+    else:
+        result, steps = binary_search(arr, target)
+        is_found = (result != -1)
+        if is_found:
+            frame = lambda: step_frame(arr, steps[-1], True, len(steps), len(steps))
+        else:
+            frame = lambda: not_found_frame(arr, target, steps)
+        timings['search'] = time_samples(lambda: binary_search(arr, target), repeat)
+        timings['render'] = time_samples(lambda: render_frame(frame()), repeat)
+        timings['format'] = time_samples(
+            lambda: (format_result(arr, target, result, steps),
+                     format_steps(steps, target, is_found)), repeat)
+
+    timings['total'] = time_samples(
+        lambda: search(array_str, target_str, large_mode), repeat,
+        setup=result_cache.clear)
+    prepared = prepare_array(array_str, large_mode)
+    timings['prepared'] = time_samples(
+        lambda: search(array_str, target_str, large_mode, prepared=prepared), repeat,
+        setup=result_cache.clear)
+    return timings
+
+
+def compare_results(baseline, current, threshold):
+    """
+    Prints how each (size, case, phase) timing moved against a baseline.
+
+    Medians are compared; a phase is a regression when it got slower by more
+    than threshold (0.1 = 10%).
+
+    Returns:
+        Number of regressions
+    """
+    def by_key(report):
+        return {(r['size'], r['case'], r['phase']): r for r in report['results']}
+
+    old, new = by_key(baseline), by_key(current)
+    regressions = 0
+    print(f"{'size':>10} {'case':<20}{'phase':<14}{'baseline':>12}{'current':>12}{'change':>9}")
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key]['median'], new[key]['median']
+        change = after / before - 1 if before else 0.0
+        flag = ''
+        if change > threshold:
+            regressions += 1
+            flag = '  SLOWER'
+        elif change < -threshold:
+            flag = '  faster'
+        size, case, phase = key
+        print(f"{size:>10} {case:<20}{phase:<14}{before * 1000:>10.3f}ms"
+              f"{after * 1000:>10.3f}ms{change:>+9.1%}{flag}")
+
+    missing = len(old.keys() - new.keys())
+    if missing:
+        print(f"\n{missing} baseline entries have no current measurement")
+    print(f"\n{regressions} regressions beyond {threshold:.0%}")
+    return regressions
+
+
+def finish_report(results, args):
+    """
+    Writes timing results to args.output and compares them with
+    args.baseline, when those options are set.
+
+    Returns:
+        Exit code: 1 if the baseline comparison found regressions
+    """
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'matplotlib': matplotlib.__version__,
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as out:
+            json.dump(report, out, indent=2)
+        print(f"\nwrote {len(results)} timings to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as base:
+            baseline = json.load(base)
+        print()
+        return 1 if compare_results(baseline, report, args.threshold) else 0
+    return 0
+
+
+def run_phases(args):
+    """Times each search() phase over the given sizes and writes a JSON report."""
+    results = []
+    for size in args.sizes:
+        if size > MAX_LARGE_ELEMENTS:
+            print(f"skipping n={size}: above MAX_LARGE_ELEMENTS ({MAX_LARGE_ELEMENTS:,})")
+            continue
+        repeat = args.repeat if size < 1_000_000 else max(1, args.repeat // 3)
+        for case in args.cases:
+            timings = phase_timings(size, case, repeat)
+            for phase, samples in timings.items():
+                results.append({
+                    'size': size,
+                    'case': case,
+                    'phase': phase,
+                    'repeat': len(samples),
+                    'best': min(samples),
+                    'median': statistics.median(samples),
+                })
+            summary = '  '.join(f"{phase} {statistics.median(samples) * 1000:8.3f}ms"
+                                for phase, samples in timings.items())
+            print(f"n={size:>9} {case:<10}{summary}", flush=True)
+
+    return finish_report(results, args)
+
+
+def run_compare(args):
+    """Compares two JSON reports written by the phases command."""
+    with open(args.baseline) as base, open(args.current) as cur:
+        baseline, current = json.load(base), json.load(cur)
+    return 1 if compare_results(baseline, current, args.threshold) else 0
+
+
+def run_render(args):
+    """
+    Measures rendering throughput with and without the render pool.
+
+    Each request renders a different frame from many client threads; a
+    worker count of 0 draws in the request threads as before.
+    """
+    arr = np.arange(MAX_VISUAL_ELEMENTS, dtype=np.int64) * 3
+    frames = []
+    for target in range(-1, 3 * MAX_VISUAL_ELEMENTS):
+        result, steps = binary_search(arr, target)
+        if result == -1:
+            frames.append(not_found_frame(arr, target, steps))
+        else:
+            frames.append(step_frame(arr, steps[-1], True, len(steps), len(steps)))
+
+    print(f"{args.requests} renders on {args.threads} threads\n")
+    baseline = None
+    for workers in args.workers:
+        start_render_pool(workers)
+        try:
+            with ThreadPoolExecutor(max_workers=args.threads) as pool:
+                list(pool.map(render_frame, frames[:args.threads]))  # warm-up
+                start = time.perf_counter()
+                list(pool.map(lambda i: render_frame(frames[i % len(frames)]),
+                              range(args.requests)))
+                elapsed = time.perf_counter() - start
+        finally:
+            stop_render_pool()
+        rate = args.requests / elapsed
+        baseline = baseline or rate
+        label = f"{workers} workers" if workers else "in-process"
+        print(f"{label:<14}{rate:8.1f} frames/s  ({rate / baseline:.2f}x)")
+    return 0
+
+
+def run_export(args):
+    """
+    Times exporting a whole trace with and without the render pool.
+
+    Each export renders and encodes every frame of a not-found search (the
+    longest trace) over a large array. RSS growth is reported too: frames
+    are streamed into the encoder, so it should not depend on their number.
+    """
+    arr = np.arange(args.size, dtype=np.int64) * 3
+    result, steps = binary_search(arr, 1)
+    with tempfile.TemporaryDirectory() as directory:
+        for export_format in args.formats:
+            path = os.path.join(directory, f'trace-{export_format}')
+            baseline = None
+            for workers in args.workers:
+                start_render_pool(workers)
+                try:
+                    before = current_rss_mb()
+                    start = time.perf_counter()
+                    count = export_trace(arr, 1, result, steps, path, export_format)
+                    elapsed = time.perf_counter() - start
+                    growth = current_rss_mb() - before
+                finally:
+                    stop_render_pool()
+                baseline = baseline or elapsed
+                label = f"{workers} workers" if workers else "in-process"
+                print(f"{export_format:<8}{label:<14}{count:4d} frames {elapsed:7.2f} s "
+                      f"({baseline / elapsed:.2f}x)  {os.path.getsize(path) / 1024:8.0f} KB"
+                      f"  RSS {growth:+6.1f} MB")
+    return 0
+
+
+def run_api(args):
+    """
+    Checks the /api/search batch API: answers, handles and rejected requests.
+
+    Requests go through the real Starlette routes (SERVER_ROUTES) with a
+    test client, so status codes are checked as a client sees them.
+    """
+    from starlette.applications import Starlette
+    from starlette.testclient import TestClient
+
+    client = TestClient(Starlette(routes=SERVER_ROUTES))
+    arr = list(range(0, 200, 2))
+    targets = [0, 4, 5, 198, -1, 1000]
+    expected = [binary_search(arr, t)[0] for t in targets]
+    failures = 0
+
+    def check(label, ok):
+        nonlocal failures
+        failures += not ok
+        print(f"{label:<52}{'OK' if ok else 'FAIL'}")
+
+    first = client.post('/api/search', json={'array': arr, 'targets': targets, 'probes': True})
+    body = first.json()
+    check('array upload answers every target', first.status_code == 200
+          and body['indices'] == expected
+          and body['probes'] == [len(binary_search(arr, t)[1]) for t in targets])
+    handle = body.get('handle')
+    for engine in ENGINE_NAMES:
+        response = client.post('/api/search', json={'handle': handle, 'targets': targets,
+                                                     'engine': engine})
+        check(f'handle reused with {engine}', response.status_code == 200
+              and response.json()['indices'] == expected)
+    check('comma-separated array accepted', client.post(
+        '/api/search', json={'array': '1, 2, 3', 'targets': [2]}).json().get('indices') == [1])
+
+    rejected = [
+        ('unsorted array', {'array': [3, 1], 'targets': [1]}, 400),
+        ('empty array', {'array': [], 'targets': []}, 400),
+        ('float in array', {'array': [1.5], 'targets': []}, 400),
+        ('value above int64', {'array': [2 ** 63], 'targets': [1]}, 400),
+        ('nested targets', {'array': [1], 'targets': [[1], [2, 3]]}, 400),
+        ('targets not a list', {'array': [1], 'targets': 5}, 400),
+        ('unknown engine', {'array': [1], 'targets': [1], 'engine': 'zz'}, 400),
+        ('unhashable engine', {'array': [1], 'targets': [1], 'engine': ['x']}, 400),
+        ('unhashable handle', {'handle': ['x'], 'targets': [1]}, 404),
+        ('unknown handle', {'handle': 'x', 'targets': [1]}, 404),
+        ('neither array nor handle', {'targets': [1]}, 400),
+        ('body not an object', [1], 400),
+        ('too many targets for a scalar engine', {
+            'array': [1], 'engine': 'interpolation',
+            'targets': [1] * (API_MAX_SCALAR_TARGETS + 1)}, 400),
+    ]
+    for label, request, status in rejected:
+        response = client.post('/api/search', json=request)
+        check(f'{label} -> {status}', response.status_code == status
+              and 'error' in response.json())
+    response = client.post('/api/search', content=b'not json')
+    check('invalid JSON -> 400', response.status_code == 400)
+
+    check('delete handle', client.delete(f'/api/arrays/{handle}').status_code == 200)
+    check('deleted handle -> 404', client.post(
+        '/api/search', json={'handle': handle, 'targets': [1]}).status_code == 404)
+    return 1 if failures else 0
+
+
+def reference_parse(array_str):
+    """The token-by-token parser parse_array falls back to, used as its reference."""
+    values = [int(x.strip()) for x in array_str.split(',') if x.strip()]
+    info = np.iinfo(np.int64)
+    if any(value < info.min or value > info.max for value in values):
+        raise OverflowError
+    return values
+
+
+def outcome(fn, *args):
+    """Returns fn's result, or the name of the exception it raised."""
+    try:
+        return fn(*args)
+    except (ValueError, OverflowError) as error:
+        return type(error).__name__
+
+
+def check_parsing(rng):
+    """
+    Checks parse_array and has_blank_entry on the inputs that switch between
+    the NumPy fast path and the fallback: blank entries, values at and past
+    the int64 limits, digit separators and junk, plus random strings.
+
+    Returns:
+        Number of failed checks
+    """
+    info = np.iinfo(np.int64)
+    cases = ['1,2,3', ' 1 , 2 ', '1,,2', '1, ,2', ',1,2,', ' , ', '', '+5', '-0',
+             '1_000', '1_000,2', '1.5', '1e3', '0x10', '1 2', 'a', '1,a',
+             str(info.max), str(info.min), f'{info.max},{info.min}',
+             str(info.max + 1), str(info.min - 1), f'1,{info.max + 1}']
+    tokens = ['0', '7', '-3', ' 12 ', '', ' ', '1_0', 'x', str(info.max), str(info.min + 1)]
+    for _ in range(2000):
+        cases.append(','.join(rng.choice(tokens) for _ in range(rng.randint(0, 6))))
+
+    failures = 0
+    for array_str in cases:
+        expected = outcome(reference_parse, array_str)
+        parsed = outcome(lambda s: parse_array(s).tolist(), array_str)
+        if parsed != expected:
+            failures += 1
+            if failures <= 10:
+                print(f"  parse_array({array_str!r}) = {parsed!r}, expected {expected!r}")
+        entries = [x.strip() for x in array_str.split(',')]
+        blank = bool(array_str.strip()) and '' in entries
+        if has_blank_entry(array_str) != blank:
+            failures += 1
+            if failures <= 10:
+                print(f"  has_blank_entry({array_str!r}) != {blank}")
+    print(f"parse_array / has_blank_entry on {len(cases)} inputs: "
+          f"{'OK' if not failures else f'{failures} failures'}")
+    return failures
+
+
+def check_lod_rows():
+    """
+    Checks lod_rows: rows cover the array once, in order, never exceed
+    max_rows, and LOW, MID and HIGH always get a bar of their own.
+
+    Returns:
+        Number of failed checks
+    """
+    failures = 0
+    cases = 0
+    for n in (1, 2, 3, 10, 24, 25, 100, 1000, 10**6, 10**7):
+        arr = np.arange(n, dtype=np.int64)
+        for target in {0, 1, n // 3, n // 2, n - 1, n, -1}:
+            _, steps = binary_search(arr, target)
+            pointers = [(s.low, s.high, s.mid) for s in (steps[i] for i in range(len(steps)))]
+            for low, high, mid in pointers + [(0, -1, None)]:
+                cases += 1
+                rows = lod_rows(n, low, high, mid)
+                covered = [first for first, _ in rows] == [0] + [last + 1 for _, last in rows[:-1]]
+                ok = (covered and rows[-1][1] == n - 1 and len(rows) <= LOD_ROWS
+                      and all(first <= last for first, last in rows))
+                if mid is not None:
+                    singles = {first for first, last in rows if first == last}
+                    ok = ok and {low, mid, high} <= singles
+                if not ok:
+                    failures += 1
+                    print(f"  lod_rows({n}, {low}, {high}, {mid}) = {rows[:6]}...")
+    print(f"lod_rows on {cases} frames: {'OK' if not failures else f'{failures} failures'}")
+    return failures
+
+
+def check_result_cache():
+    """
+    Checks ResultCache's entry and byte limits, LRU order and counters.
+
+    Returns:
+        Number of failed checks
+    """
+    def entry(size):
+        return (b'x' * size, '', '')
+
+    checks = []
+    cache = ResultCache(max_entries=3, max_bytes=10_000)
+    for key in 'abcd':
+        cache.put(key, entry(10))
+    checks.append(('entry limit evicts the oldest', cache.get('a') is None
+                   and all(cache.get(key) is not None for key in 'bcd')))
+    cache.get('b')
+    cache.put('e', entry(10))
+    checks.append(('a read keeps an entry', cache.get('b') is not None and cache.get('c') is None))
+
+    cache = ResultCache(max_entries=100, max_bytes=1000)
+    for key in range(5):
+        cache.put(key, entry(300))
+    checks.append(('byte limit holds', cache.size <= 1000 and len(cache.entries) == 3
+                   and cache.get(4) is not None))
+    cache.put('big', entry(2000))
+    checks.append(('oversized entry is not stored', cache.get('big') is None
+                   and cache.get(4) is not None))
+
+    cache = ResultCache(max_entries=0)
+    cache.put('a', entry(1))
+    checks.append(('max_entries=0 disables the cache', cache.get('a') is None))
+
+    cache = ResultCache()
+    cache.put('a', entry(1))
+    cache.get('a')
+    cache.get('b')
+    checks.append(('hits and misses are counted', (cache.hits, cache.misses) == (1, 1)))
+    cache.clear()
+    checks.append(('clear empties the cache', cache.get('a') is None and cache.size == 0))
+
+    failures = 0
+    for label, ok in checks:
+        failures += not ok
+        print(f"  ResultCache: {label:<40}{'OK' if ok else 'FAIL'}")
+    return failures
+
+
+def check_non_positive():
+    """
+    Checks that search() draws arrays whose largest value is zero or
+    negative with every engine, in both display modes.
+
+    Returns:
+        Number of failed checks
+    """
+    failures = 0
+    cases = 0
+    for array_str, targets in (('0', (0, 1)), ('-3, -1, 0', (-1, 0, 2)),
+                               ('-5, -3, 0', (-3, -4)), ('-9, -4, -2', (-4, 7))):
+        values = [int(x) for x in array_str.split(',')]
+        for target in targets:
+            for engine in ENGINE_NAMES:
+                for large_mode in (False, True):
+                    cases += 1
+                    try:
+                        # Matplotlib warns that an all-zero axis is singular
+                        with warnings.catch_warnings():
+                            warnings.simplefilter('ignore', UserWarning)
+                            result = search(array_str, str(target), large_mode,
+                                            engine=engine)[1]
+                    except Exception as error:
+                        result = f"{type(error).__name__}: {error}"
+                    status = 'Target found' if target in values else 'Target not found'
+                    if f"**Status:** {status}\n" not in result:
+                        failures += 1
+                        print(f"  search({array_str!r}, {target}, large_mode={large_mode}, "
+                              f"engine={engine!r}): {result.splitlines()[0]}")
+    print(f"search() on arrays with max <= 0, {cases} cases: "
+          f"{'OK' if not failures else f'{failures} failures'}")
+    return failures
+
+
+def run_behaviour(args):
+    """Checks parsing, level-of-detail rows, the result cache and non-positive arrays."""
+    rng = random.Random(args.seed)
+    failures = (check_parsing(rng) + check_lod_rows() + check_result_cache()
+                + check_non_positive())
+    return 1 if failures else 0
+
+
+# Runs in a fresh interpreter: imports app, prepares start-up in the given
+# mode, waits (standing in for the server starting) and serves one search
+STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+matplotlib_loaded = 'matplotlib' in sys.modules
+app.prepare_startup(sys.argv[1])
+ready = time.perf_counter()
+time.sleep(float(sys.argv[2]))
+first = time.perf_counter()
+app.search('1, 3, 5, 7, 9, 11', '9')
+done = time.perf_counter()
+print(json.dumps({'import': imported - start, 'prepare': ready - imported,
+                  'first_request': done - first,
+                  'matplotlib_at_import': matplotlib_loaded}))
+"""
+
+
+def startup_run(mode, delay):
+    """
+    Starts a new interpreter, imports app and times its first search.
+
+    Returns:
+        Dictionary of stage -> seconds: 'import' (import app), 'prepare'
+        (prepare_startup), 'first_request' and 'total' (process start to
+        first response, not counting the delay), plus 'matplotlib_at_import'
+    """
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', STARTUP_PROBE, mode, str(delay)],
+                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                            env={**os.environ, 'GRADIO_ANALYTICS_ENABLED': 'False'},
+                            capture_output=True, text=True, check=True).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings['total'] = time.perf_counter() - start - delay
+    return timings
+
+
+def run_startup(args):
+    """
+    Times cold start-up (import and first request) in each start-up mode.
+
+    --delay is the time between start-up and the first request (the server
+    launching); background warm-up can finish within it.
+    """
+    results = []
+    stages = ('import', 'prepare', 'first_request', 'total')
+    print(f"{args.runs} runs per mode, first request {args.delay:.1f}s after start-up\n")
+    print(f"{'mode':<12}" + ''.join(f"{stage:>15}" for stage in stages))
+    for mode in args.modes:
+        runs = [startup_run(mode, args.delay) for _ in range(args.runs)]
+        if any(run['matplotlib_at_import'] for run in runs):
+            print("  note: matplotlib was imported by 'import app'")
+        medians = {}
+        for stage in stages:
+            samples = [run[stage] for run in runs]
+            medians[stage] = statistics.median(samples)
+            results.append({
+                'size': 0,
+                'case': f'startup-{mode}',
+                'phase': stage,
+                'repeat': len(samples),
+                'best': min(samples),
+                'median': medians[stage],
+            })
+        print(f"{mode:<12}" + ''.join(f"{medians[stage] * 1000:>13.1f}ms" for stage in stages))
+    return finish_report(results, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    check = commands.add_parser('check', help='verify batch_search against binary_search')
+    check.add_argument('--size', type=int, default=100_000)
+    check.add_argument('--queries', type=int, default=10_000)
+    check.add_argument('--seed', type=int, default=0)
+    check.set_defaults(func=run_check)
+
+    layouts = commands.add_parser('layouts',
+                                  help='verify and time the Eytzinger and blocked layouts')
+    layouts.add_argument('--size', type=int, default=1_000_000)
+    layouts.add_argument('--queries', type=int, default=200_000)
+    layouts.add_argument('--seed', type=int, default=0)
+    layouts.set_defaults(func=run_layouts)
+
+    engines = commands.add_parser('engines',
+                                  help='compare probe counts of the search engines')
+    engines.add_argument('--size', type=int, default=1_000_000)
+    engines.add_argument('--queries', type=int, default=20_000)
+    engines.add_argument('--seed', type=int, default=0)
+    engines.set_defaults(func=run_engines)
+
+    allocations = commands.add_parser('allocations',
+                                      help='measure per-call trace allocations')
+    allocations.add_argument('--size', type=int, default=1_000_000)
+    allocations.add_argument('--queries', type=int, default=2_000)
+    allocations.set_defaults(func=run_allocations)
+
+    soak = commands.add_parser('soak', help='check memory stays flat under load')
+    soak.add_argument('--requests', type=int, default=10_000)
+    soak.add_argument('--threads', type=int, default=8)
+    soak.add_argument('--max-growth', type=float, default=25.0)
+    soak.set_defaults(func=run_soak)
+
+    phases = commands.add_parser('phases',
+                                 help='time parse/search/render/format phases of search()')
+    phases.add_argument('--sizes', type=int, nargs='+',
+                        default=[MAX_VISUAL_ELEMENTS, 1_000, 100_000, 1_000_000, 10_000_000])
+    phases.add_argument('--cases', nargs='+', choices=['found', 'not_found', 'error'],
+                        default=['found', 'not_found', 'error'])
+    phases.add_argument('--repeat', type=int, default=9,
+                        help='runs per phase (a third of this from 10^6 elements up)')
+    phases.add_argument('--output', help='write the results to this JSON file')
+    phases.add_argument('--baseline', help='compare against a previous JSON report')
+    phases.add_argument('--threshold', type=float, default=0.10)
+    phases.set_defaults(func=run_phases)
+
+    compare = commands.add_parser('compare', help='compare two phases JSON reports')
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=0.10,
+                         help='slowdown that counts as a regression (0.1 = 10%%)')
+    compare.set_defaults(func=run_compare)
+
+    render = commands.add_parser('render', help='compare in-process and pooled rendering')
+    render.add_argument('--workers', type=int, nargs='+',
+                        default=[0, 1, 2, max(os.cpu_count() or 1, 2)],
+                        help='render pool sizes to try (0 = in-process)')
+    render.add_argument('--requests', type=int, default=200)
+    render.add_argument('--threads', type=int, default=8)
+    render.set_defaults(func=run_render)
+
+    export = commands.add_parser('export', help='time full-trace exports with the render pool')
+    export.add_argument('--workers', type=int, nargs='+',
+                        default=[0, max(os.cpu_count() or 1, 2)],
+                        help='render pool sizes to try (0 = in-process)')
+    export.add_argument('--formats', nargs='+', choices=['gif', 'sprites', 'mp4'],
+                        default=['gif', 'sprites'])
+    export.add_argument('--size', type=int, default=10**6)
+    export.set_defaults(func=run_export)
+
+    behaviour = commands.add_parser('behaviour',
+                                    help='check parsing, level-of-detail rows, the result cache and arrays with max <= 0')
+    behaviour.add_argument('--seed', type=int, default=0)
+    behaviour.set_defaults(func=run_behaviour)
+
+    api = commands.add_parser('api', help='check the /api/search batch API')
+    api.set_defaults(func=run_api)
+
+    startup = commands.add_parser('startup', help='time cold start and the first request')
+    startup.add_argument('--modes', nargs='+', choices=['lazy', 'background', 'eager'],
+                         default=['lazy', 'background', 'eager'])
+    startup.add_argument('--runs', type=int, default=5)
+    startup.add_argument('--delay', type=float, default=1.0,
+                         help='seconds between start-up and the first request')
+    startup.add_argument('--output', help='write the results to this JSON file')
+    startup.add_argument('--baseline', help='compare against a previous JSON report')
+    startup.add_argument('--threshold', type=float, default=0.10)
+    startup.set_defaults(func=run_startup)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())